@@ -1,15 +1,14 @@
 #!/usr/bin/env python3
 """
 Simple example of using Git-Claude-Chat programmatically.
+
+Install the package first (``pip install -e .`` from the project root), or
+run with ``PYTHONPATH=.`` from the project root without installing.
 """
 import os
 import sys
-from pathlib import Path
 from dotenv import load_dotenv
 
-# Add the parent directory to the path so we can import the package
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 from src.git_handler import GitHandler
 from src.claude_client import ClaudeClient
 
@@ -27,24 +26,22 @@ def main():
     # Example repository URL
     repo_url = "https://github.com/openai/openai-python.git"
     
-    # Clone the repository
-    print(f"Cloning repository: {repo_url}")
+    # Fetch the repository into MongoDB. Binary and oversized files are
+    # skipped at fetch time, before their contents are downloaded.
+    print(f"Fetching repository: {repo_url}")
     git_handler = GitHandler(repo_url=repo_url)
-    repo_path = git_handler.clone_repository()
+    git_handler.fetch_repository()
     
     # Get the list of files
     print("Getting file list...")
-    files = git_handler.get_file_list()
+    files = git_handler.get_all_files()
     
     # Limit to 10 files for this example
     files = files[:10]
     print(f"Using {len(files)} files for context")
     
-    # Read the contents of each file
-    code_files = {}
-    for file in files:
-        content = git_handler.read_file(file)
-        code_files[file] = content
+    # Stream the contents of the files from one query straight into the prompt
+    code_files = git_handler.iter_file_contents(files)
         
     # Initialize the Claude client
     claude_client = ClaudeClient()
@@ -0,0 +1,187 @@
+"""
+BM25 search index over repository files for Git-Claude-Chat.
+"""
+import os
+import re
+import gzip
+import json
+import math
+import heapq
+from pathlib import Path
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from rich.console import Console
+
+console = Console()
+
+# Alphanumeric runs; underscores, dots, slashes etc. separate tokens
+_WORD_RE = re.compile(r'[A-Za-z0-9]+')
+
+# Parts of a camelCase / PascalCase / ACRONYMCase identifier
+_CAMEL_RE = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+
+# File name of a persisted index inside the repository's data directory
+_INDEX_FILE = "bm25.json.gz"
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search tokens, code-aware.
+    
+    snake_case, dotted and path-like names are split on their separators and
+    camelCase names on case changes; compound identifiers are also kept whole
+    so that exact identifier matches score higher.
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        List[str]: Tokens
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        parts = _CAMEL_RE.findall(word)
+        if len(parts) > 1:
+            tokens.append(word.lower())
+        tokens.extend(part.lower() for part in parts if len(part) > 1)
+    return tokens
+
+def index_path(repo_id: str) -> Path:
+    """
+    Get the location of a repository's persisted index.
+    
+    Args:
+        repo_id: Repository ID
+    
+    Returns:
+        Path: Path of the index file
+    """
+    return Path.home() / ".git-claude-chat" / repo_id / _INDEX_FILE
+
+class BM25Index:
+    """
+    BM25 index with scores precomputed at index time.
+    
+    Every (term, document) score is computed when the index is built, so a
+    query only sums the stored scores of its terms' postings.
+    """
+    
+    def __init__(self, doc_ids: List[str], postings: Dict[str, List[Tuple[int, float]]]):
+        """
+        Initialize the index.
+        
+        Args:
+            doc_ids: Document IDs (file paths), indexed by document number
+            postings: Mapping of term to (document number, score) pairs
+        """
+        self.doc_ids = doc_ids
+        self.postings = postings
+    
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[str, str]], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """
+        Build an index over file paths and contents.
+        
+        Args:
+            documents: (file path, content) pairs
+            k1: Term frequency saturation
+            b: Document length normalization
+        
+        Returns:
+            BM25Index: The index
+        """
+        doc_ids = []
+        doc_lengths = []
+        term_freqs = defaultdict(list)  # term -> [(document number, term frequency)]
+        
+        for file_path, content in documents:
+            tokens = tokenize(file_path)
+            tokens.extend(tokenize(content))
+            doc_number = len(doc_ids)
+            doc_ids.append(file_path)
+            doc_lengths.append(len(tokens))
+            for term, freq in Counter(tokens).items():
+                term_freqs[term].append((doc_number, freq))
+        
+        num_docs = len(doc_ids)
+        avg_length = (sum(doc_lengths) / num_docs) if num_docs else 0.0
+        
+        postings = {}
+        for term, freqs in term_freqs.items():
+            idf = math.log(1 + (num_docs - len(freqs) + 0.5) / (len(freqs) + 0.5))
+            term_postings = []
+            for doc_number, freq in freqs:
+                norm = k1 * (1 - b + b * doc_lengths[doc_number] / avg_length)
+                term_postings.append((doc_number, idf * freq * (k1 + 1) / (freq + norm)))
+            postings[term] = term_postings
+        
+        return cls(doc_ids, postings)
+    
+    def search(self, query: str, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Rank documents for a query.
+        
+        Args:
+            query: Query text
+            k: Maximum number of results (all matching documents if None)
+        
+        Returns:
+            List[Tuple[str, float]]: (file path, score) pairs, best first
+        """
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            for doc_number, score in self.postings.get(term, ()):
+                scores[doc_number] += score
+        
+        if k is None:
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        else:
+            ranked = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.doc_ids[doc_number], score) for doc_number, score in ranked]
+    
+    def save(self, path: Path) -> None:
+        """
+        Persist the index as gzipped JSON.
+        
+        Args:
+            path: Path of the index file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "doc_ids": self.doc_ids,
+            "postings": {
+                term: [[doc_number, round(score, 4)] for doc_number, score in term_postings]
+                for term, term_postings in self.postings.items()
+            }
+        }
+        
+        # Write to a temporary file first so a reader never sees a partial index
+        tmp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(str(tmp_path), "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(str(tmp_path), str(path))
+    
+    @classmethod
+    def load(cls, path: Path) -> Optional["BM25Index"]:
+        """
+        Load a persisted index.
+        
+        Args:
+            path: Path of the index file
+        
+        Returns:
+            Optional[BM25Index]: The index, or None if it does not exist or cannot be read
+        """
+        try:
+            with gzip.open(str(path), "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            console.print(f"[yellow]Warning: could not load search index {path}: {e}")
+            return None
+        
+        postings = {
+            term: [(doc_number, score) for doc_number, score in term_postings]
+            for term, term_postings in data["postings"].items()
+        }
+        return cls(data["doc_ids"], postings)
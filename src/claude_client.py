@@ -2,12 +2,45 @@
 Claude API client for Git-Claude-Chat.
 """
 import os
-from typing import Dict, List, Optional, Union
+import re
+import functools
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 import anthropic
 from rich.console import Console
 
 console = Console()
 
+# Code files as a mapping of path to content, or as (path, content) pairs that
+# are consumed once while the prompt is built
+CodeFiles = Union[Mapping[str, str], Iterable[Tuple[str, str]]]
+
+# Anthropic API keys look like 'sk-ant-api03-...'
+_API_KEY_RE = re.compile(r'sk-[A-Za-z0-9_\-]+')
+
+# Fixed parts of the system prompt
+_BASE_SYSTEM_PROMPT = """You are an expert software engineer and code assistant. 
+You are analyzing a Git repository codebase. 
+Your task is to help the user understand the code, answer questions about it, and provide insights.
+Be thorough, accurate, and helpful in your responses.
+
+The following files from the repository are available for your analysis:
+"""
+
+_FILE_LIST_HEADER = "\nHere are the contents of these files:\n\n"
+
+_ANSWERING_INSTRUCTIONS = """
+When answering questions:
+1. Reference specific files and line numbers when relevant
+2. Explain code patterns and architecture decisions
+3. Provide code examples when helpful
+4. If you're unsure about something, acknowledge the uncertainty
+"""
+
+@functools.lru_cache(maxsize=4)
+def _make_anthropic_client(api_key: str) -> anthropic.Anthropic:
+    """Create (or reuse) an Anthropic client and its HTTP connection pool for an API key."""
+    return anthropic.Anthropic(api_key=api_key)
+
 class ClaudeClient:
     """Client for interacting with Claude API."""
     
@@ -25,28 +58,22 @@ class ClaudeClient:
                 "Claude API key is required. Either pass it directly or set the CLAUDE_API_KEY environment variable."
             )
         
-        # Clean the API key - remove any non-ASCII characters and whitespace
-        try:
-            # First try to clean by encoding/decoding with replace for non-ASCII chars
-            self.api_key = api_key_raw.encode('ascii', errors='ignore').decode('ascii').strip()
+        # Clean the API key - keep only the 'sk-...' token, dropping any
+        # surrounding whitespace or stray non-ASCII characters
+        match = _API_KEY_RE.search(api_key_raw)
+        if not match:
+            console.print("[red]Error processing API key: no 'sk-' key found")
+            raise ValueError("Invalid API key format")
             
-            # If the key starts with 'sk-', make sure we keep only that part and what follows
-            if 'sk-' in self.api_key:
-                sk_index = self.api_key.find('sk-')
-                if sk_index >= 0:
-                    self.api_key = self.api_key[sk_index:]
-                    
-            console.print(f"[green]API key processed successfully")
-        except Exception as e:
-            console.print(f"[red]Error processing API key: {e}")
-            raise ValueError("Invalid API key format") from e
+        self.api_key = match.group(0)
+        console.print(f"[green]API key processed successfully")
             
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.client = _make_anthropic_client(self.api_key)
         
     def chat_with_codebase(
         self, 
         message: str, 
-        code_files: Dict[str, str],
+        code_files: CodeFiles,
         max_tokens: int = 4000,
         model: str = "claude-3-opus-20240229"
     ) -> str:
@@ -55,7 +82,8 @@ class ClaudeClient:
         
         Args:
             message: User's message/question about the code
-            code_files: Dictionary of file paths and their contents
+            code_files: Dictionary of file paths and their contents, or an
+                iterable of (path, content) pairs such as a database cursor
             max_tokens: Maximum number of tokens in the response
             model: Claude model to use
             
@@ -65,91 +93,70 @@ class ClaudeClient:
         try:
             # Prepare the system prompt
             console.print("[yellow]Preparing system prompt...")
-            system_prompt = self._prepare_system_prompt(code_files)
-            
-            # Ensure message is properly encoded
-            console.print("[yellow]Encoding user message...")
-            safe_message = message.encode('utf-8', errors='replace').decode('utf-8')
+            system_blocks = self._prepare_system_prompt(code_files)
             
             console.print("[yellow]Sending request to Claude API...")
             response = self.client.messages.create(
                 model=model,
                 max_tokens=max_tokens,
-                system=system_prompt,
+                system=system_blocks,
                 messages=[
-                    {"role": "user", "content": safe_message}
+                    {"role": "user", "content": message}
                 ]
             )
             return response.content[0].text
-        except UnicodeEncodeError as e:
-            console.print(f"[red]Encoding error: {e}")
-            console.print(f"[red]Error location: {e.object[:e.start]}[bold red]→{e.object[e.start:e.end]}←[/bold red]{e.object[e.end:e.end+10]}")
-            raise
         except Exception as e:
             console.print(f"[red]Error communicating with Claude API: {e}")
             console.print(f"[red]Error type: {type(e).__name__}")
             raise
     
-    def _prepare_system_prompt(self, code_files: Dict[str, str]) -> str:
+    def _prepare_system_prompt(self, code_files: CodeFiles) -> List[Dict[str, Any]]:
         """
         Prepare the system prompt with code context.
         
+        The prompt is returned as a list of text content blocks (one per file)
+        rather than one large string. The last block carries a cache_control
+        marker so repeated questions over the same files can reuse Anthropic's
+        prompt cache.
+        
+        When code_files is an iterable of pairs, each file is turned into its
+        block as it arrives. The blocks hold a copy of every file until the
+        request is sent, but the pairs themselves (e.g. query results) are not
+        kept alongside them.
+        
         Args:
-            code_files: Dictionary of file paths and their contents
+            code_files: Dictionary of file paths and their contents, or an
+                iterable of (path, content) pairs
             
         Returns:
-            str: System prompt with code context
+            List[Dict[str, Any]]: System prompt content blocks with code context
         """
         try:
-            # Start with a base system prompt
-            system_prompt = """You are an expert software engineer and code assistant. 
-You are analyzing a Git repository codebase. 
-Your task is to help the user understand the code, answer questions about it, and provide insights.
-Be thorough, accurate, and helpful in your responses.
-
-The following files from the repository are available for your analysis:
-"""
-            
-            # Add file list
-            for file_path in code_files.keys():
-                system_prompt += f"- {file_path}\n"
+            if isinstance(code_files, Mapping):
+                code_files = code_files.items()
                 
-            system_prompt += "\nHere are the contents of these files:\n\n"
-            
-            # Add file contents with clear separators
-            for file_path, content in code_files.items():
-                console.print(f"[dim]Processing file: {file_path}[/dim]")
+            # Build the file list and the file blocks in a single pass
+            header_parts = [_BASE_SYSTEM_PROMPT]
+            file_blocks = []
+            for file_path, content in code_files:
+                header_parts.append(f"- {file_path}\n")
                 
-                # Skip very large files or binary files
-                if (content.startswith("[Binary file") or 
-                    content.startswith("[Large file") or 
-                    content.startswith("[Error reading file") or
-                    len(content) > 100000):
-                    system_prompt += f"--- {file_path} ---\n{content}\n\n"
-                else:
-                    try:
-                        # Ensure content is properly encoded
-                        safe_content = content.encode('utf-8', errors='replace').decode('utf-8')
-                        system_prompt += f"--- {file_path} ---\n{safe_content}\n\n"
-                    except Exception as e:
-                        console.print(f"[red]Error encoding file {file_path}: {e}")
-                        system_prompt += f"--- {file_path} ---\n[Encoding error - content omitted]\n\n"
-                    
-            system_prompt += """
-When answering questions:
-1. Reference specific files and line numbers when relevant
-2. Explain code patterns and architecture decisions
-3. Provide code examples when helpful
-4. If you're unsure about something, acknowledge the uncertainty
-"""
-            
-            # Final encoding check for the entire system prompt
-            try:
-                system_prompt = system_prompt.encode('utf-8', errors='replace').decode('utf-8')
-            except Exception as e:
-                console.print(f"[red]Error in final encoding of system prompt: {e}")
+                # Contents are already decoded str (GitHandler decodes each blob
+                # once at fetch time), so they can be used as-is
+                file_blocks.append({"type": "text", "text": f"--- {file_path} ---\n{content}\n\n"})
                 
-            return system_prompt
+            header_parts.append(_FILE_LIST_HEADER)
+            console.print(f"[dim]Processed {len(file_blocks)} files[/dim]")
+            
+            blocks = [{"type": "text", "text": "".join(header_parts)}]
+            blocks.extend(file_blocks)
+            blocks.append({
+                "type": "text",
+                "text": _ANSWERING_INSTRUCTIONS,
+                # Caches the whole prefix up to and including this block
+                "cache_control": {"type": "ephemeral"}
+            })
+            return blocks
             
         except Exception as e:
             console.print(f"[red]Error preparing system prompt: {e}")
@@ -158,7 +165,7 @@ When answering questions:
         
     def analyze_codebase(
         self, 
-        code_files: Dict[str, str],
+        code_files: CodeFiles,
         max_tokens: int = 4000,
         model: str = "claude-3-opus-20240229"
     ) -> str:
@@ -166,7 +173,8 @@ When answering questions:
         Get a general analysis of the codebase.
         
         Args:
-            code_files: Dictionary of file paths and their contents
+            code_files: Dictionary of file paths and their contents, or an
+                iterable of (path, content) pairs
             max_tokens: Maximum number of tokens in the response
             model: Claude model to use
             
@@ -3,32 +3,224 @@ File selection algorithm for Git-Claude-Chat.
 """
 import os
 import re
-from typing import Dict, List, Tuple
+import string
+import functools
+import itertools
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple
 from pathlib import Path
 import math
-from collections import Counter
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
 
+from src.bm25_index import BM25Index
+
 console = Console()
 
+# Most characters of file contents kept in a selector's cache; older entries
+# are evicted first
+_FILE_CACHE_CHARS = 32 * 1024 * 1024
+
+# Number of files whose contents are fetched together for scoring
+_SCORE_BATCH_SIZE = 100
+
+# Returned when a file cannot be scored without reading its content
+_READ_CONTENT = object()
+
+# Size of the per-file trigram signature (a Bloom filter over the file's
+# lowercase 3-grams), computed at fetch time and stored with the file
+SIGNATURE_BITS = 4096
+
+# No real tokenizer averages more characters per token than this, so longer
+# content can be rejected against a token budget without tokenizing it
+_MAX_CHARS_PER_TOKEN = 8
+
+# Common words that carry no meaning for file selection
+STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'as', 'what',
+    'which', 'this', 'that', 'these', 'those', 'then', 'just', 'so', 'than',
+    'such', 'both', 'through', 'about', 'for', 'is', 'of', 'while', 'during',
+    'to', 'from', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'once',
+    'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both',
+    'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
+    'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't',
+    'can', 'will', 'don', 'should', 'now', 'using', 'use', 'used', 'uses'
+})
+
+# Technology names that are added as keywords when they appear in a query
+TECH_KEYWORDS = frozenset({
+    'react', 'vue', 'angular', 'node', 'express', 'django', 'flask',
+    'python', 'javascript', 'typescript', 'java', 'kotlin', 'swift',
+    'go', 'rust', 'c#', 'csharp', 'dotnet', 'php', 'laravel', 'ruby',
+    'rails', 'mongodb', 'mongo', 'mysql', 'postgresql', 'firebase', 'aws',
+    'azure', 'gcp', 'docker', 'kubernetes', 'graphql', 'rest', 'api',
+    'redux', 'vuex', 'mobx', 'tensorflow', 'pytorch', 'keras',
+    'scikit', 'pandas', 'numpy', 'matplotlib', 'seaborn', 'dask',
+    'spark', 'hadoop', 'kafka', 'rabbitmq', 'redis', 'elasticsearch',
+    'webpack', 'babel', 'vite', 'rollup', 'jest', 'mocha', 'chai',
+    'cypress', 'selenium', 'puppeteer', 'storybook', 'tailwind',
+    'bootstrap', 'material', 'sass', 'less', 'styled', 'emotion',
+    'nextjs', 'nuxt', 'gatsby', 'svelte', 'flutter', 'react-native',
+    'ionic', 'electron', 'pwa', 'webassembly', 'wasm', 'deno', 'bun',
+    'groq', 'mistral', 'llama', 'claude', 'gpt', 'openai', 'huggingface',
+    'transformers', 'bert', 'llm', 'rag', 'langchain', 'pinecone',
+    'database', 'db', 'connect', 'connection', 'config', 'configuration',
+    'setup', 'install', 'env', 'environment', 'variable'
+})
+
+# Keywords added when a query mentions a related technology or topic
+MONGO_RELATED_KEYWORDS = frozenset({'database', 'db', 'connect', 'connection', 'config', 'nosql'})
+LARAVEL_RELATED_KEYWORDS = frozenset({'php', 'framework', 'config', 'env', 'database', 'db'})
+CONNECTION_RELATED_KEYWORDS = frozenset({'config', 'configuration', 'env', 'environment', 'variable', 'setting'})
+
+# File extensions that earn a type bonus when scoring
+CODE_EXT = frozenset({'.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.kt', '.swift',
+                      '.go', '.rs', '.cs', '.php', '.rb', '.c', '.cpp', '.h', '.hpp'})
+CONFIG_EXT = frozenset({'.json', '.yml', '.yaml', '.toml', '.ini', '.cfg', '.conf'})
+DOC_EXT = frozenset({'.md', '.txt', '.rst', '.adoc'})
+
+# Only files with one of these extensions, or an important name, are scored
+SCORABLE_EXT = CODE_EXT | CONFIG_EXT | DOC_EXT
+
+# File names that earn a bonus when scoring
+PACKAGE_FILE_NAMES = frozenset({'package.json', 'requirements.txt', 'pyproject.toml',
+                                'setup.py', 'pom.xml', 'build.gradle', 'gemfile'})
+MAIN_FILE_NAMES = frozenset({'main.py', 'index.js', 'app.py', 'server.js', 'index.ts', 'app.js'})
+IMPORTANT_NAMES = PACKAGE_FILE_NAMES | MAIN_FILE_NAMES
+
+# Matches any technology name as a whole word. Longest names come first so that
+# e.g. 'react-native' wins over 'react'; lookarounds stand in for \b so that
+# names ending in punctuation such as 'c#' still match.
+TECH_RE = re.compile(
+    r'(?<!\w)(?:' + '|'.join(map(re.escape, sorted(TECH_KEYWORDS, key=len, reverse=True))) + r')(?!\w)'
+)
+
+# Replaces punctuation with spaces (underscores are kept, as in identifiers)
+_PUNCT_TABLE = str.maketrans({c: ' ' for c in string.punctuation if c != '_'})
+
+# Map of technologies to relevant file patterns
+TECH_PATTERNS = {
+    'react': [r'react', r'jsx', r'tsx', r'component'],
+    'vue': [r'vue', r'vuex', r'nuxt'],
+    'angular': [r'angular', r'ng'],
+    'node': [r'node', r'express', r'server\.js'],
+    'python': [r'\.py$', r'flask', r'django', r'requirements\.txt'],
+    'django': [r'django', r'urls\.py', r'views\.py', r'models\.py'],
+    'flask': [r'flask', r'app\.py', r'routes\.py'],
+    'javascript': [r'\.js$', r'\.jsx$'],
+    'typescript': [r'\.ts$', r'\.tsx$', r'tsconfig'],
+    'groq': [r'groq', r'llm', r'ai'],
+    'mistral': [r'mistral', r'llm', r'ai'],
+    'llama': [r'llama', r'llm', r'ai'],
+    'claude': [r'claude', r'anthropic', r'llm', r'ai'],
+    'gpt': [r'gpt', r'openai', r'llm', r'ai'],
+    'langchain': [r'langchain', r'llm', r'ai', r'rag'],
+    'docker': [r'docker', r'dockerfile', r'compose'],
+    'kubernetes': [r'k8s', r'kubernetes', r'helm'],
+    'aws': [r'aws', r'amazon', r'lambda', r's3', r'ec2'],
+    'database': [r'db', r'database', r'sql', r'mongo', r'postgres', r'\.env', r'config'],
+    'api': [r'api', r'rest', r'graphql', r'endpoint'],
+    'auth': [r'auth', r'login', r'jwt', r'oauth'],
+    'test': [r'test', r'spec', r'jest', r'mocha', r'cypress'],
+    'mongodb': [r'mongo', r'mongodb', r'nosql', r'database\.php', r'\.env', r'config'],
+    'laravel': [r'laravel', r'\.env', r'config', r'database\.php', r'composer\.json'],
+    'connect': [r'\.env', r'config', r'database', r'connection', r'setup'],
+}
+
+# One compiled alternation per technology
+_TECH_REGEX = {tech: re.compile('|'.join(patterns)) for tech, patterns in TECH_PATTERNS.items()}
+
+# Words in a query that activate a technology's file patterns
+_TECH_TRIGGERS = {tech: tech for tech in TECH_PATTERNS}
+_TECH_TRIGGERS.update({'mongo': 'mongodb', 'connection': 'connect', 'setup': 'connect'})
+
+# Finds every trigger occurring in a query (even overlapping ones, via the
+# lookahead) in one pass, i.e. the same matches as a substring test per trigger
+_TECH_TRIGGER_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(trigger) for trigger in sorted(_TECH_TRIGGERS, key=len, reverse=True)) + '))'
+)
+
+def trigram_signature(text: str) -> bytes:
+    """
+    Compute a Bloom-filter signature of the lowercase 3-grams of a text.
+    
+    A keyword can only occur in a text if every bit of the keyword's own
+    signature is set in the text's signature, so files can be ruled out
+    without reading their contents.
+    
+    Args:
+        text: Text to summarise
+        
+    Returns:
+        bytes: Signature of SIGNATURE_BITS bits
+    """
+    text = text.lower()
+    bits = bytearray(SIGNATURE_BITS // 8)
+    for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+        bit = zlib.crc32(trigram.encode('utf-8', errors='replace')) % SIGNATURE_BITS
+        bits[bit >> 3] |= 1 << (bit & 7)
+    return bytes(bits)
+
+@functools.lru_cache(maxsize=1)
+def _get_token_encoding():
+    """
+    Load the tiktoken encoding used for token counts.
+    
+    Returns:
+        The cl100k_base encoding, or None if tiktoken is not installed or the
+        encoding cannot be loaded (it is downloaded on first use)
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
 class FileSelector:
     """Selects relevant files from a repository based on a query."""
     
-    def __init__(self, repo_path: str):
+    def __init__(
+        self, 
+        repo_path: str, 
+        content_provider: Optional[Callable[[str], Optional[str]]] = None, 
+        search_index: Optional[BM25Index] = None,
+        contents_provider: Optional[Callable[[List[str]], Dict[str, str]]] = None
+    ):
         """
         Initialize the FileSelector.
         
         Args:
             repo_path: Path to the repository
+            content_provider: Callable returning the content of a file given its
+                path (e.g. GitHandler.get_file_content). If not given, files are
+                read from disk under repo_path.
+            search_index: Prebuilt BM25 index of the repository, used to rank
+                files instead of scoring each of them per query
+            contents_provider: Callable returning the contents of several files
+                at once (e.g. GitHandler.get_file_contents), used to fetch the
+                candidate files in one round trip instead of one per file
         """
         self.repo_path = repo_path
+        self._content_provider = content_provider
+        self._contents_provider = contents_provider
+        self.search_index = search_index
+        
+        # File contents read for scoring and reused when files are selected,
+        # least recently used first and bounded by _FILE_CACHE_CHARS; the
+        # scoring threads share it
+        self._file_cache: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._file_cache_chars = 0
+        self._file_cache_lock = threading.Lock()
         
     def get_relevant_files(
         self, 
         query: str, 
         all_files: List[str], 
         max_files: int = 10, 
-        max_tokens: int = 100000
+        max_tokens: int = 100000,
+        file_metadata: Optional[Dict[str, Dict[str, Any]]] = None
     ) -> Tuple[Dict[str, str], int]:
         """
         Get the most relevant files for a query.
@@ -38,6 +230,8 @@ class FileSelector:
             all_files: List of all files in the repository
             max_files: Maximum number of files to return
             max_tokens: Maximum number of tokens to include
+            file_metadata: Optional mapping of file path to metadata such as
+                "size", used instead of checking each file on disk
             
         Returns:
             Tuple[Dict[str, str], int]: Dictionary of file paths and contents, and token count
@@ -46,59 +240,160 @@ class FileSelector:
         keywords = self._extract_keywords(query)
         console.print(f"[yellow]Extracted keywords: {', '.join(keywords)}")
         
-        # Score files based on relevance to keywords
-        scored_files = self._score_files(all_files, keywords)
-        
-        # Get the top files
-        relevant_files = {}
-        total_tokens = 0
-        
-        # First, include files with exact technology matches
+        # Rank files with the repository's search index if there is one,
+        # otherwise score every file on its keywords
+        all_files_set = set(all_files)
+        if self.search_index is not None:
+            scored_files = [
+                (file_path, score) for file_path, score in self.search_index.search(query)
+                if file_path in all_files_set
+            ]
+        else:
+            scored_files = self._score_files(all_files, keywords, file_metadata)
+        
+        # First technology matches, then the highest scored files, then README
+        # and package files; each candidate is considered at most once
         tech_files = self._get_technology_specific_files(query, all_files)
-        for file_path in tech_files:
-            if file_path in all_files and len(relevant_files) < max_files:
-                content = self._read_file(file_path)
-                if content:
-                    # Estimate tokens (rough approximation: 4 chars = 1 token)
-                    tokens = len(content) // 4
-                    if total_tokens + tokens <= max_tokens:
-                        relevant_files[file_path] = content
-                        total_tokens += tokens
-                        console.print(f"[green]Including technology-specific file: {file_path} ({tokens} tokens)")
-        
-        # Then add the highest scored files
-        for file_path, score in scored_files:
-            if file_path not in relevant_files and len(relevant_files) < max_files:
-                content = self._read_file(file_path)
-                if content:
-                    # Estimate tokens (rough approximation: 4 chars = 1 token)
-                    tokens = len(content) // 4
-                    if total_tokens + tokens <= max_tokens:
-                        relevant_files[file_path] = content
-                        total_tokens += tokens
-                        console.print(f"[green]Including scored file: {file_path} (score: {score:.2f}, {tokens} tokens)")
-        
-        # Always include README and package files if they exist and we have space
         important_files = [
-            f for f in all_files 
-            if f.lower().endswith('readme.md') or 
-               f.lower() == 'package.json' or 
-               f.lower() == 'requirements.txt'
+            f for f, f_lower in ((f, f.lower()) for f in all_files)
+            if f_lower.endswith('readme.md') or 
+               f_lower == 'package.json' or 
+               f_lower == 'requirements.txt'
         ]
+        candidates = itertools.chain(
+            ((file_path, "technology-specific file", None) for file_path in tech_files if file_path in all_files_set),
+            ((file_path, "scored file", score) for file_path, score in scored_files),
+            ((file_path, "important file", None) for file_path in important_files),
+        )
         
-        for file_path in important_files:
-            if file_path not in relevant_files and len(relevant_files) < max_files:
+        return self._collect_files(candidates, max_files, max_tokens)
+    
+    def get_representative_files(
+        self, 
+        all_files: List[str], 
+        max_files: int = 20, 
+        max_tokens: int = 100000
+    ) -> Tuple[Dict[str, str], int]:
+        """
+        Get a representative sample of files for a general analysis of the repository.
+        
+        READMEs come first, then package files and entry points, then code files
+        spread across the top-level directories: each round takes the next
+        shallowest code file from every directory.
+        
+        Args:
+            all_files: List of all files in the repository
+            max_files: Maximum number of files to return
+            max_tokens: Maximum number of tokens to include
+            
+        Returns:
+            Tuple[Dict[str, str], int]: Dictionary of file paths and contents, and token count
+        """
+        # Shallow files first, they tend to describe the project as a whole
+        by_depth = sorted(all_files, key=lambda f: (f.count('/'), f))
+        names = {f: os.path.basename(f).lower() for f in by_depth}
+        
+        readmes = [f for f in by_depth if names[f].startswith('readme')]
+        package_files = [f for f in by_depth if names[f] in PACKAGE_FILE_NAMES]
+        main_files = [f for f in by_depth if names[f] in MAIN_FILE_NAMES]
+        
+        code_by_dir = defaultdict(list)
+        for f in by_depth:
+            if Path(f).suffix.lower() in CODE_EXT:
+                code_by_dir[f.split('/', 1)[0] if '/' in f else ''].append(f)
+        spread_files = [
+            f for round_files in itertools.zip_longest(*code_by_dir.values())
+            for f in round_files if f is not None
+        ]
+        
+        candidates = itertools.chain(
+            ((file_path, "README", None) for file_path in readmes),
+            ((file_path, "package file", None) for file_path in package_files),
+            ((file_path, "entry point", None) for file_path in main_files),
+            ((file_path, "code file", None) for file_path in spread_files),
+        )
+        return self._collect_files(candidates, max_files, max_tokens)
+    
+    def _collect_files(
+        self, 
+        candidates: Iterable[Tuple[str, str, Optional[float]]], 
+        max_files: int, 
+        max_tokens: int
+    ) -> Tuple[Dict[str, str], int]:
+        """
+        Take candidate files in order until the file or token limit is reached.
+        
+        Candidates are taken in windows of as many files as are still missing,
+        and each window's contents are fetched together.
+        
+        Args:
+            candidates: (file path, kind of candidate, score or None) tuples,
+                best first; repeated paths are considered once
+            max_files: Maximum number of files to return
+            max_tokens: Maximum number of tokens to include
+            
+        Returns:
+            Tuple[Dict[str, str], int]: Dictionary of file paths and contents, and token count
+        """
+        candidates = iter(candidates)
+        relevant_files = {}
+        total_tokens = 0
+        considered = set()
+        
+        while len(relevant_files) < max_files:
+            window = []
+            for file_path, kind, score in candidates:
+                if file_path in considered:
+                    continue
+                considered.add(file_path)
+                window.append((file_path, kind, score))
+                if len(window) >= max_files - len(relevant_files):
+                    break
+            if not window:
+                break
+                
+            self._prefetch(file_path for file_path, _, _ in window)
+            for file_path, kind, score in window:
                 content = self._read_file(file_path)
-                if content:
-                    tokens = len(content) // 4
-                    if total_tokens + tokens <= max_tokens:
-                        relevant_files[file_path] = content
-                        total_tokens += tokens
-                        console.print(f"[green]Including important file: {file_path} ({tokens} tokens)")
+                if not content:
+                    continue
+                    
+                tokens = self._count_tokens(content, max_tokens - total_tokens)
+                if total_tokens + tokens > max_tokens:
+                    continue
+                    
+                relevant_files[file_path] = content
+                total_tokens += tokens
+                details = f"score: {score:.2f}, {tokens} tokens" if score is not None else f"{tokens} tokens"
+                console.print(f"[green]Including {kind}: {file_path} ({details})")
         
         console.print(f"[green]Selected {len(relevant_files)} files with approximately {total_tokens} tokens")
         return relevant_files, total_tokens
     
+    def _count_tokens(self, content: str, budget: int) -> int:
+        """
+        Count the tokens in a file's content.
+        
+        Uses tiktoken when available and falls back to the rough approximation
+        of 4 chars = 1 token. Content that cannot fit in the budget at any
+        tokenization rate is only estimated.
+        
+        Args:
+            content: Content of the file
+            budget: Number of tokens still available
+            
+        Returns:
+            int: Token count
+        """
+        estimate = len(content) // 4
+        if len(content) // _MAX_CHARS_PER_TOKEN > budget:
+            return estimate
+            
+        encoding = _get_token_encoding()
+        if encoding is None:
+            return estimate
+        return len(encoding.encode_ordinary(content))
+    
     def _extract_keywords(self, query: str) -> List[str]:
         """
         Extract keywords from a query.
@@ -109,134 +404,200 @@ class FileSelector:
         Returns:
             List[str]: List of keywords
         """
-        # Convert to lowercase and remove punctuation
-        query = re.sub(r'[^\w\s]', ' ', query.lower())
+        # Convert to lowercase
+        query_lower = query.lower()
         
-        # Split into words
-        words = query.split()
+        # Split into words, treating punctuation as whitespace
+        words = query_lower.translate(_PUNCT_TABLE).split()
         
         # Remove common stop words
-        stop_words = {
-            'a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'as', 'what',
-            'which', 'this', 'that', 'these', 'those', 'then', 'just', 'so', 'than',
-            'such', 'both', 'through', 'about', 'for', 'is', 'of', 'while', 'during',
-            'to', 'from', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'once',
-            'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both',
-            'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
-            'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't',
-            'can', 'will', 'don', 'should', 'now', 'using', 'use', 'used', 'uses'
-        }
-        
-        keywords = [word for word in words if word not in stop_words and len(word) > 2]
-        
-        # Add technology-specific keywords that might be in the query
-        tech_keywords = {
-            'react', 'vue', 'angular', 'node', 'express', 'django', 'flask',
-            'python', 'javascript', 'typescript', 'java', 'kotlin', 'swift',
-            'go', 'rust', 'c#', 'csharp', 'dotnet', 'php', 'laravel', 'ruby',
-            'rails', 'mongodb', 'mongo', 'mysql', 'postgresql', 'firebase', 'aws',
-            'azure', 'gcp', 'docker', 'kubernetes', 'graphql', 'rest', 'api',
-            'redux', 'vuex', 'mobx', 'tensorflow', 'pytorch', 'keras',
-            'scikit', 'pandas', 'numpy', 'matplotlib', 'seaborn', 'dask',
-            'spark', 'hadoop', 'kafka', 'rabbitmq', 'redis', 'elasticsearch',
-            'webpack', 'babel', 'vite', 'rollup', 'jest', 'mocha', 'chai',
-            'cypress', 'selenium', 'puppeteer', 'storybook', 'tailwind',
-            'bootstrap', 'material', 'sass', 'less', 'styled', 'emotion',
-            'nextjs', 'nuxt', 'gatsby', 'svelte', 'flutter', 'react-native',
-            'ionic', 'electron', 'pwa', 'webassembly', 'wasm', 'deno', 'bun',
-            'groq', 'mistral', 'llama', 'claude', 'gpt', 'openai', 'huggingface',
-            'transformers', 'bert', 'llm', 'rag', 'langchain', 'pinecone',
-            'database', 'db', 'connect', 'connection', 'config', 'configuration',
-            'setup', 'install', 'env', 'environment', 'variable'
-        }
-        
-        # Check if any tech keywords are in the original query (case insensitive)
-        query_lower = query.lower()
-        for tech in tech_keywords:
-            if tech in query_lower and tech not in keywords:
-                keywords.append(tech)
+        keywords = {word for word in words if word not in STOP_WORDS and len(word) > 2}
+        
+        # Add technology-specific keywords, matched on the original query so that
+        # names containing punctuation (e.g. 'c#', 'react-native') are found too
+        keywords.update(TECH_RE.findall(query_lower))
         
         # Add related keywords for specific technologies
         if 'mongo' in query_lower or 'mongodb' in query_lower:
-            related_keywords = ['database', 'db', 'connect', 'connection', 'config', 'nosql']
-            for keyword in related_keywords:
-                if keyword not in keywords:
-                    keywords.append(keyword)
+            keywords |= MONGO_RELATED_KEYWORDS
                     
         if 'laravel' in query_lower:
-            related_keywords = ['php', 'framework', 'config', 'env', 'database', 'db']
-            for keyword in related_keywords:
-                if keyword not in keywords:
-                    keywords.append(keyword)
+            keywords |= LARAVEL_RELATED_KEYWORDS
         
         # If the query is about connecting technologies, add connection-related keywords
         if 'connect' in query_lower or 'connection' in query_lower or 'setup' in query_lower:
-            related_keywords = ['config', 'configuration', 'env', 'environment', 'variable', 'setting']
-            for keyword in related_keywords:
-                if keyword not in keywords:
-                    keywords.append(keyword)
+            keywords |= CONNECTION_RELATED_KEYWORDS
         
-        return keywords
+        return sorted(keywords)
     
-    def _score_files(self, files: List[str], keywords: List[str]) -> List[Tuple[str, float]]:
+    def _score_files(
+        self, 
+        files: List[str], 
+        keywords: List[str], 
+        file_metadata: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> List[Tuple[str, float]]:
         """
         Score files based on relevance to keywords.
         
         Args:
             files: List of files
             keywords: List of keywords
+            file_metadata: Optional mapping of file path to metadata such as "size"
             
         Returns:
             List[Tuple[str, float]]: List of (file_path, score) tuples
         """
+        # Lowercase the keywords once and match all of them in a single pass
+        keywords_lower = [keyword.lower() for keyword in keywords]
+        pattern = self._compile_keyword_pattern(keywords_lower)
+        
+        # Keyword signatures for ruling out files from their stored signature;
+        # keywords shorter than a trigram could be anywhere, so they disable it
+        keyword_signatures = None
+        if keywords_lower and all(len(keyword) >= 3 for keyword in keywords_lower):
+            keyword_signatures = [int.from_bytes(trigram_signature(keyword), 'little') for keyword in set(keywords_lower)]
+        
+        # Files that the checks on their path and metadata alone cannot settle
+        # have to be read; the rest are skipped or already scored
         scores = []
-        
+        to_read = []
         for file_path in files:
-            # Skip very large files and binary files
+            prescore = self._prescore_file(file_path, keywords_lower, file_metadata, keyword_signatures)
+            if prescore is _READ_CONTENT:
+                to_read.append(file_path)
+            elif prescore is not None:
+                scores.append((file_path, prescore))
+                
+        # Fetch the contents in batches (one round trip each with a contents
+        # provider) and score each batch in parallel; file I/O and the C-level
+        # regex scan release the GIL
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for start in range(0, len(to_read), _SCORE_BATCH_SIZE):
+                batch = to_read[start:start + _SCORE_BATCH_SIZE]
+                self._prefetch(batch)
+                results = executor.map(
+                    lambda file_path: self._score_file_content(file_path, keywords_lower, pattern),
+                    batch
+                )
+                scores.extend(result for result in results if result is not None)
+                
+        # Sort by score in descending order
+        return sorted(scores, key=lambda x: x[1], reverse=True)
+    
+    def _prescore_file(
+        self, 
+        file_path: str, 
+        keywords_lower: List[str], 
+        file_metadata: Optional[Dict[str, Dict[str, Any]]] = None,
+        keyword_signatures: Optional[List[int]] = None
+    ) -> Any:
+        """
+        Score a file from its path and metadata alone, if possible.
+        
+        Args:
+            file_path: Path to the file
+            keywords_lower: List of lowercase keywords
+            file_metadata: Optional mapping of file path to metadata such as
+                "size" and "signature"
+            keyword_signatures: Trigram signatures of the keywords, as ints
+            
+        Returns:
+            None if the file is skipped, its score if no keyword can occur in
+            it, or _READ_CONTENT if its content has to be read and scored
+        """
+        # Skip files that cannot earn a type or name bonus (including binary
+        # files) before doing any I/O for them
+        file_name = os.path.basename(file_path).lower()
+        ext = Path(file_path).suffix.lower()
+        if ext not in SCORABLE_EXT and file_name not in IMPORTANT_NAMES and 'readme' not in file_name:
+            return None
+            
+        # Skip very large files, using the known size when available instead
+        # of a stat call per file
+        metadata = None
+        if file_metadata is not None:
+            metadata = file_metadata.get(file_path, {})
+            size = metadata.get("size") or 0
+        else:
             full_path = os.path.join(self.repo_path, file_path)
             try:
-                if os.path.getsize(full_path) > 1000000:  # Skip files larger than ~1MB
-                    continue
+                size = os.path.getsize(full_path)
             except Exception:
-                continue
-                
-            # Get the file extension
-            ext = Path(file_path).suffix.lower()
+                return None
+        if size > 1000000:  # Skip files larger than ~1MB
+            return None
             
-            # Skip binary files and large data files
-            if ext in ['.png', '.jpg', '.jpeg', '.gif', '.ico', '.svg', '.woff', 
-                      '.woff2', '.ttf', '.eot', '.mp3', '.mp4', '.avi', '.mov',
-                      '.pdf', '.zip', '.tar', '.gz', '.rar', '.7z', '.bin', '.exe',
-                      '.dll', '.so', '.dylib', '.class', '.pyc', '.pyd', '.pyo']:
-                continue
-                
-            # Read the file content
-            content = self._read_file(file_path)
-            if not content:
-                continue
+        # If the stored signature proves that no keyword occurs in the file, score
+        # it on its name and size alone without reading the content
+        signature = metadata.get("signature") if metadata else None
+        if keyword_signatures is not None and signature and size:
+            file_bits = int.from_bytes(signature, 'little')
+            if not any(file_bits & keyword_bits == keyword_bits for keyword_bits in keyword_signatures):
+                return self._calculate_score(file_path, "", keywords_lower, None, size)
                 
-            # Calculate the score
-            score = self._calculate_score(file_path, content, keywords)
-            scores.append((file_path, score))
+        return _READ_CONTENT
+        
+    def _score_file_content(
+        self, 
+        file_path: str, 
+        keywords_lower: List[str], 
+        pattern: Optional[Pattern]
+    ) -> Optional[Tuple[str, float]]:
+        """
+        Read a file and calculate its relevance score.
+        
+        Args:
+            file_path: Path to the file
+            keywords_lower: List of lowercase keywords
+            pattern: Compiled alternation of the keywords
             
-        # Sort by score in descending order
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+        Returns:
+            Optional[Tuple[str, float]]: (file_path, score), or None if the file has no content
+        """
+        content = self._read_file(file_path)
+        if not content:
+            return None
+            
+        return file_path, self._calculate_score(file_path, content, keywords_lower, pattern)
     
-    def _calculate_score(self, file_path: str, content: str, keywords: List[str]) -> float:
+    def _compile_keyword_pattern(self, keywords_lower: List[str]) -> Optional[Pattern]:
+        """
+        Compile the keywords into a single case-insensitive alternation regex.
+        
+        Args:
+            keywords_lower: List of lowercase keywords
+            
+        Returns:
+            Optional[Pattern]: Compiled pattern, or None if there are no keywords
+        """
+        if not keywords_lower:
+            return None
+            
+        # Longest first so that e.g. 'mongodb' wins over 'mongo'
+        alternatives = sorted(set(keywords_lower), key=len, reverse=True)
+        return re.compile('|'.join(re.escape(keyword) for keyword in alternatives), re.IGNORECASE)
+    
+    def _calculate_score(
+        self, 
+        file_path: str, 
+        content: str, 
+        keywords_lower: List[str], 
+        pattern: Optional[Pattern],
+        content_length: Optional[int] = None
+    ) -> float:
         """
         Calculate the relevance score for a file.
         
         Args:
             file_path: Path to the file
             content: Content of the file
-            keywords: List of keywords
+            keywords_lower: List of lowercase keywords
+            pattern: Compiled alternation of the keywords
+            content_length: Length used for size normalization (defaults to len(content))
             
         Returns:
             float: Relevance score
         """
-        # Convert content to lowercase for case-insensitive matching
-        content_lower = content.lower()
-        
         # Get the file name and extension
         file_name = os.path.basename(file_path).lower()
         ext = Path(file_path).suffix.lower()
@@ -245,16 +606,11 @@ class FileSelector:
         score = 0.0
         
         # Score based on file extension
-        code_extensions = ['.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.kt', '.swift',
-                          '.go', '.rs', '.cs', '.php', '.rb', '.c', '.cpp', '.h', '.hpp']
-        config_extensions = ['.json', '.yml', '.yaml', '.toml', '.ini', '.cfg', '.conf']
-        doc_extensions = ['.md', '.txt', '.rst', '.adoc']
-        
-        if ext in code_extensions:
+        if ext in CODE_EXT:
             score += 2.0
-        elif ext in config_extensions:
+        elif ext in CONFIG_EXT:
             score += 1.5
-        elif ext in doc_extensions:
+        elif ext in DOC_EXT:
             score += 1.0
             
         # Bonus for README files
@@ -262,21 +618,28 @@ class FileSelector:
             score += 3.0
             
         # Bonus for package files
-        if file_name in ['package.json', 'requirements.txt', 'pyproject.toml', 
-                         'setup.py', 'pom.xml', 'build.gradle', 'gemfile']:
+        if file_name in PACKAGE_FILE_NAMES:
             score += 2.5
             
         # Bonus for main/index files
-        if file_name in ['main.py', 'index.js', 'app.py', 'server.js', 'index.ts', 'app.js']:
+        if file_name in MAIN_FILE_NAMES:
             score += 2.0
             
+        # Count occurrences of all keywords in one case-insensitive scan over the
+        # whole content (no lowercased copy). Files are only ruled out by their
+        # trigram signature beforehand when every keyword has at least 3
+        # characters (e.g. not with 'db') and the file's metadata includes a
+        # signature; otherwise every scorable file is scanned here
+        counts = Counter()
+        if pattern:
+            counts = Counter(m.group(0).lower() for m in pattern.finditer(content))
+        
         # Score based on keyword matches
-        for keyword in keywords:
-            # Count occurrences of the keyword
-            count = content_lower.count(keyword.lower())
+        for keyword in keywords_lower:
+            count = counts[keyword]
             
             # Higher weight for keywords in the file name
-            if keyword.lower() in file_name:
+            if keyword in file_name:
                 score += 3.0
                 
             # Add score based on frequency
@@ -286,7 +649,9 @@ class FileSelector:
                 
         # Normalize by file size (to prevent large files from having advantage just by size)
         # But use logarithmic scaling to not overly penalize larger files
-        size_factor = math.log(len(content) + 1)
+        if content_length is None:
+            content_length = len(content)
+        size_factor = math.log(content_length + 1)
         if size_factor > 0:
             score = score / math.sqrt(size_factor)
             
@@ -304,58 +669,69 @@ class FileSelector:
             List[str]: List of technology-specific files
         """
         query_lower = query.lower()
-        tech_files = []
-        
-        # Map of technologies to relevant file patterns
-        tech_patterns = {
-            'react': [r'react', r'jsx', r'tsx', r'component'],
-            'vue': [r'vue', r'vuex', r'nuxt'],
-            'angular': [r'angular', r'ng'],
-            'node': [r'node', r'express', r'server\.js'],
-            'python': [r'\.py$', r'flask', r'django', r'requirements\.txt'],
-            'django': [r'django', r'urls\.py', r'views\.py', r'models\.py'],
-            'flask': [r'flask', r'app\.py', r'routes\.py'],
-            'javascript': [r'\.js$', r'\.jsx$'],
-            'typescript': [r'\.ts$', r'\.tsx$', r'tsconfig'],
-            'groq': [r'groq', r'llm', r'ai'],
-            'mistral': [r'mistral', r'llm', r'ai'],
-            'llama': [r'llama', r'llm', r'ai'],
-            'claude': [r'claude', r'anthropic', r'llm', r'ai'],
-            'gpt': [r'gpt', r'openai', r'llm', r'ai'],
-            'langchain': [r'langchain', r'llm', r'ai', r'rag'],
-            'docker': [r'docker', r'dockerfile', r'compose'],
-            'kubernetes': [r'k8s', r'kubernetes', r'helm'],
-            'aws': [r'aws', r'amazon', r'lambda', r's3', r'ec2'],
-            'database': [r'db', r'database', r'sql', r'mongo', r'postgres', r'\.env', r'config'],
-            'api': [r'api', r'rest', r'graphql', r'endpoint'],
-            'auth': [r'auth', r'login', r'jwt', r'oauth'],
-            'test': [r'test', r'spec', r'jest', r'mocha', r'cypress'],
-            'mongodb': [r'mongo', r'mongodb', r'nosql', r'database\.php', r'\.env', r'config'],
-            'laravel': [r'laravel', r'\.env', r'config', r'database\.php', r'composer\.json'],
-            'connect': [r'\.env', r'config', r'database', r'connection', r'setup'],
-        }
-        
-        # Check if any technology is mentioned in the query
-        for tech, patterns in tech_patterns.items():
-            if tech in query_lower or (tech == 'mongodb' and 'mongo' in query_lower) or (tech == 'connect' and ('connect' in query_lower or 'connection' in query_lower or 'setup' in query_lower)):
-                # Find files matching the patterns
-                for file_path in all_files:
-                    file_path_lower = file_path.lower()
-                    for pattern in patterns:
-                        if re.search(pattern, file_path_lower):
-                            tech_files.append(file_path)
-                            break
+        tech_files = set()
+        
+        # Only technologies mentioned in the query contribute file patterns;
+        # all of them are found in a single scan over the query
+        active_techs = {_TECH_TRIGGERS[trigger] for trigger in _TECH_TRIGGER_RE.findall(query_lower)}
+        
+        # Find files matching the patterns of any active technology
+        if active_techs:
+            for file_path in all_files:
+                file_path_lower = file_path.lower()
+                for tech in active_techs:
+                    if _TECH_REGEX[tech].search(file_path_lower):
+                        tech_files.add(file_path)
+                        break
         
         # Always include important configuration files for database connections
         important_config_files = ['.env', '.env.example', 'database.php', 'config/database.php', 'config/app.php', 'composer.json']
         for file_path in all_files:
             file_name = os.path.basename(file_path)
             if file_name in important_config_files or any(config_file in file_path for config_file in important_config_files):
-                tech_files.append(file_path)
+                tech_files.add(file_path)
         
-        return list(set(tech_files))  # Remove duplicates
+        return list(tech_files)
     
-    def _read_file(self, file_path: str) -> str:
+    def _prefetch(self, file_paths: Iterable[str]) -> None:
+        """
+        Fetch the contents of files not read yet in one call to the contents provider.
+        
+        Args:
+            file_paths: Paths of the files relative to the repository root
+        """
+        if self._contents_provider is None:
+            return
+            
+        with self._file_cache_lock:
+            missing = [file_path for file_path in file_paths if file_path not in self._file_cache]
+        if not missing:
+            return
+            
+        contents = self._contents_provider(missing)
+        for file_path in missing:
+            self._cache_file(file_path, contents.get(file_path))
+            
+    def _cache_file(self, file_path: str, content: Optional[str]) -> None:
+        """
+        Add a file's contents to the cache, evicting the least recently used
+        files beyond _FILE_CACHE_CHARS.
+        
+        Args:
+            file_path: Path to the file relative to the repository root
+            content: Contents of the file, or None if it cannot be read
+        """
+        with self._file_cache_lock:
+            previous = self._file_cache.pop(file_path, None)
+            self._file_cache_chars -= len(previous or "")
+            self._file_cache[file_path] = content
+            self._file_cache_chars += len(content or "")
+            while self._file_cache_chars > _FILE_CACHE_CHARS and len(self._file_cache) > 1:
+                _, evicted = self._file_cache.popitem(last=False)
+                self._file_cache_chars -= len(evicted or "")
+                
+
+    def _read_file(self, file_path: str) -> Optional[str]:
         """
         Read the contents of a file.
         
@@ -363,13 +739,24 @@ class FileSelector:
             file_path: Path to the file relative to the repository root
             
         Returns:
-            str: Contents of the file, or None if the file cannot be read
+            Optional[str]: Contents of the file, or None if the file cannot be read
         """
-        # When using MongoDB, we need to get the file content from the database
-        # This method is called from get_relevant_files, which is called from chat_with_codebase
-        # In chat_with_codebase, we're using git_handler.get_file_content to get the actual content
-        # So here we just return a placeholder that will be replaced later
-        
-        # For scoring purposes, we'll return a small placeholder
-        # The actual content will be fetched from MongoDB in chat_with_codebase
-        return f"[File content will be fetched from MongoDB: {file_path}]"
+        # Files are read for scoring and again when selected; read each once
+        # unless it was evicted in between
+        with self._file_cache_lock:
+            if file_path in self._file_cache:
+                self._file_cache.move_to_end(file_path)
+                return self._file_cache[file_path]
+                
+
+        if self._content_provider is not None:
+            content = self._content_provider(file_path)
+        else:
+            try:
+                with open(os.path.join(self.repo_path, file_path), "r", encoding="utf-8", errors="replace") as f:
+                    content = f.read()
+            except OSError:
+                content = None
+                
+        self._cache_file(file_path, content)
+        return content
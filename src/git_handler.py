@@ -2,18 +2,85 @@
 GitHub repository handling module for Git-Claude-Chat.
 """
 import os
+import re
 import base64
+import logging
+import itertools
+import threading
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from urllib.parse import quote
+from typing import Optional, Iterable, Iterator, List, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 import github
+import requests
+from requests.adapters import HTTPAdapter
 from github import Github
 from rich.console import Console
 from rich.progress import Progress
 
-from src.mongodb_handler import MongoDBHandler
+from src.mongodb_handler import get_mongodb_handler
+from src.file_selector import trigram_signature
+from src.bm25_index import BM25Index, index_path
 
 console = Console()
+logger = logging.getLogger(__name__)
 
+# Number of threads downloading blobs, and the most blobs submitted at once
+_FETCH_WORKERS = 16
+_MAX_IN_FLIGHT_BLOBS = 4 * _FETCH_WORKERS
+
+# Owner and repository name in a GitHub URL; repository names may contain
+# dots, so only a trailing ".git" is dropped
+_REPO_RE = re.compile(r"github\.com[:/]([^/]+)/([^/]+?)(?:\.git)?(?:/|$)")
+
+# Files larger than this are not fetched
+_MAX_FILE_BYTES = 1 << 20
+
+# Common binary file types, skipped without downloading them
+_BIN_EXTS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.svg',
+    '.pdf', '.zip', '.tar', '.gz', '.rar', '.7z',
+    '.exe', '.dll', '.so', '.dylib',
+    '.pyc', '.pyo', '.pyd',
+    '.mp3', '.mp4', '.avi', '.mov', '.flv',
+    '.ttf', '.woff', '.woff2', '.eot'
+)
+
+# Items per page for paginated GitHub listings (the API maximum; the default is 30)
+_PER_PAGE = 100
+
+# Requests kept in reserve on a token before the next token is preferred
+_RATE_LIMIT_RESERVE = 100
+
+# Raw file contents are served without the base64/JSON wrapping of the blob API
+_RAW_CONTENT_URL = "https://raw.githubusercontent.com/{full_name}/{ref}/{path}"
+
+# Seconds to wait for a raw file download
+_RAW_TIMEOUT = 30
+
+# Number of files stored in MongoDB per bulk write
+_WRITE_BATCH_SIZE = 500
+
+def _remaining_requests(client: Github) -> int:
+    """
+    Get the number of requests a client has left according to its last response.
+    
+    Github.rate_limiting requests /rate_limit while the client has not made a
+    request yet; its requester holds the values from the last response
+    headers, -1 before the first one.
+    
+    Args:
+        client: GitHub client
+        
+    Returns:
+        int: Remaining requests, or -1 if the client has not made a request yet
+    """
+    requester = getattr(client, "requester", None)
+    if requester is None:
+        # Releases without the public accessor only have the private attribute
+        requester = getattr(client, "_Github__requester")
+    return requester.rate_limiting[0]
+    
 class GitHandler:
     """Handles GitHub repository operations."""
     
@@ -26,54 +93,98 @@ class GitHandler:
             owner: Repository owner (alternative to repo_url)
             repo: Repository name (alternative to repo_url)
         """
-        self.github_token = os.environ.get("GITHUB_TOKEN")
-        if not self.github_token:
+        # GITHUB_TOKENS may hold several comma-separated tokens; requests are
+        # spread across them so their rate limits add up
+        tokens = os.environ.get("GITHUB_TOKENS", os.environ.get("GITHUB_TOKEN", "")).split(",")
+        self.github_tokens = [token.strip() for token in tokens if token.strip()]
+        self.github_token = self.github_tokens[0] if self.github_tokens else None
+        if not self.github_tokens:
             console.print("[yellow]Warning: GITHUB_TOKEN environment variable not set. Using unauthenticated access with rate limits.")
-            self.github = Github()
+            self._clients = [Github(per_page=_PER_PAGE)]
+            self._client_headers = {self._clients[0]: {}}
         else:
-            self.github = Github(self.github_token)
+            self._clients = [Github(token, per_page=_PER_PAGE) for token in self.github_tokens]
+            self._client_headers = {
+                client: {"Authorization": f"token {token}"} for client, token in zip(self._clients, self.github_tokens)
+            }
+        self.github = self._clients[0]
+        self._client_cycle = itertools.cycle(self._clients)
+        self._client_lock = threading.Lock()
+        self._thread_local = threading.local()
+        
+        # Shared keep-alive connection pool for raw file downloads, sized for
+        # the download threads
+        self._http = requests.Session()
+        self._http.mount("https://", HTTPAdapter(pool_connections=_FETCH_WORKERS, pool_maxsize=_FETCH_WORKERS))
+        self._commit_sha = None
             
         self.repo_url = repo_url
         self.owner = owner
         self.repo_name = repo
         self.repo = None
         self.repo_id = None
+        self._failed_paths = []
+        self._stored_count = 0
+        self._writer = None  # Writer thread for file batches while fetching
+        self._pending_write = None
+        self._files_cache = None  # (repo_id, file paths) from the last get_all_files call
         
         # Parse repo_url if provided
         if repo_url and not (owner and repo):
             self._parse_repo_url()
             
         # Initialize MongoDB handler
-        self.mongodb = MongoDBHandler()
+        self.mongodb = get_mongodb_handler()
+        
+    def _pick_client(self) -> Github:
+        """
+        Pick the next GitHub client in round-robin order that has requests left.
+        
+        Uses the rate limit reported by each client's last response, so picking
+        does not cost a request (see _remaining_requests).
+        
+        Returns:
+            Github: Client with remaining requests, or the one with the most left
+        """
+        with self._client_lock:
+            candidates = [next(self._client_cycle) for _ in self._clients]
+            
+        for client in candidates:
+            remaining = _remaining_requests(client)
+            # A negative count means the client has not made a request yet
+            if remaining < 0 or remaining > _RATE_LIMIT_RESERVE:
+                return client
+        return max(candidates, key=_remaining_requests)
+        
+    def _get_thread_repo(self) -> Any:
+        """
+        Get the repository object bound to this thread's GitHub client.
+        
+        Each download thread sticks to one client, so its keep-alive
+        connection is reused across blobs.
+        
+        Returns:
+            Repository: Lazily loaded repository (no request is made)
+        """
+        repo = getattr(self._thread_local, "repo", None)
+        if repo is None:
+            client = self._pick_client()
+            repo = client.get_repo(self.repo.full_name, lazy=True)
+            self._thread_local.repo = repo
+            self._thread_local.headers = self._client_headers[client]
+        return repo
         
     def _parse_repo_url(self) -> None:
         """Parse repository URL to extract owner and repo name."""
-        try:
-            # Handle different GitHub URL formats
-            if "github.com" in self.repo_url:
-                # Remove .git extension if present
-                clean_url = self.repo_url.rstrip(".git")
-                
-                # Extract owner and repo from URL
-                parts = clean_url.split("/")
-                if "github.com" in parts:
-                    idx = parts.index("github.com")
-                    if len(parts) > idx + 2:
-                        self.owner = parts[idx + 1]
-                        self.repo_name = parts[idx + 2]
-                else:
-                    # Handle github.com/owner/repo format
-                    if len(parts) >= 2:
-                        self.owner = parts[-2]
-                        self.repo_name = parts[-1]
-            else:
-                raise ValueError(f"Invalid GitHub repository URL: {self.repo_url}")
-                
-            console.print(f"[green]Parsed repository: {self.owner}/{self.repo_name}")
-        except Exception as e:
-            console.print(f"[red]Error parsing repository URL: {e}")
+        # Handles https, ssh (git@github.com:owner/repo.git) and scheme-less URLs
+        match = _REPO_RE.search(self.repo_url)
+        if not match:
+            console.print(f"[red]Error parsing repository URL: {self.repo_url}")
             raise ValueError(f"Invalid GitHub repository URL: {self.repo_url}")
             
+        self.owner, self.repo_name = match.group(1), match.group(2)
+        console.print(f"[green]Parsed repository: {self.owner}/{self.repo_name}")
+            
     def fetch_repository(self, force: bool = False) -> str:
         """
         Fetch the GitHub repository data and store it in MongoDB.
@@ -95,12 +206,14 @@ class GitHandler:
                 existing_repo = self.mongodb.get_repository_by_name(self.owner, self.repo_name)
                 if existing_repo and not force:
                     self.repo_id = str(existing_repo["_id"])
+                    if not index_path(self.repo_id).exists():
+                        self.build_search_index()
                     progress.update(task, advance=1)
                     console.print(f"[green]Repository already exists in database with ID: {self.repo_id}")
                     return self.repo_id
                 
                 # Fetch repository from GitHub
-                self.repo = self.github.get_repo(f"{self.owner}/{self.repo_name}")
+                self.repo = self._pick_client().get_repo(f"{self.owner}/{self.repo_name}")
                 
                 # Store repository information in MongoDB
                 repo_info = {
@@ -111,19 +224,31 @@ class GitHandler:
                     "url": self.repo.html_url,
                     "default_branch": self.repo.default_branch,
                     "language": self.repo.language,
-                    "fetched_at": self.repo.updated_at.isoformat()
+                    "fetched_at": self.repo.updated_at.isoformat(),
+                    # Set again once every file is stored; until then the stored
+                    # files may be partly updated, and a failed or interrupted
+                    # fetch must make the next one compare every file
+                    "tree_sha": None
                 }
                 
-                # If force is True and repository exists, delete it first
+                # If force is True and repository exists, refresh it in place:
+                # only files whose blob SHA changed are downloaded again
+                previous_tree_sha = None
                 if force and existing_repo:
-                    console.print(f"[yellow]Force option specified. Deleting existing repository...")
-                    self.repo_id = str(existing_repo["_id"])
-                    self.mongodb.delete_repository(self.repo_id)
+                    console.print(f"[yellow]Force option specified. Refreshing existing repository...")
+                    previous_tree_sha = existing_repo.get("tree_sha")
                 
                 self.repo_id = self.mongodb.store_repository_info(repo_info)
+                self._files_cache = None
                 
-                # Fetch and store file contents
-                self._fetch_repository_contents()
+                # Fetch and store file contents, remembering the tree they came
+                # from only if all of them were stored
+                tree_sha = self._fetch_repository_contents(previous_tree_sha, progress)
+                if tree_sha:
+                    self.mongodb.update_repository_info(self.repo_id, {"tree_sha": tree_sha})
+                    
+                # Index the stored files once, so chats do not rescore every file
+                self.build_search_index()
                 
                 progress.update(task, advance=1)
                 console.print(f"[green]Repository fetched successfully with ID: {self.repo_id}")
@@ -138,48 +263,202 @@ class GitHandler:
                 console.print(f"[red]Error: {e}")
                 raise
                 
-    def _fetch_repository_contents(self, path: str = "") -> None:
+    def _fetch_repository_contents(
+        self, 
+        previous_tree_sha: Optional[str] = None, 
+        progress: Optional[Progress] = None
+    ) -> Optional[str]:
         """
-        Recursively fetch repository contents and store them in MongoDB.
+        Fetch repository contents and store them in MongoDB.
+        
+        The whole file list comes from a single recursive Git Tree API request;
+        only the blobs of files that are not skipped, and whose SHA differs from
+        the stored copy, are then downloaded.
         
         Args:
-            path: Path within the repository to fetch
+            previous_tree_sha: SHA of the tree the stored files were fetched from
+            progress: Progress display to report downloaded files on
+            
+        Returns:
+            Optional[str]: SHA of the fetched tree, or None if the stored files
+            may be incomplete
         """
         try:
-            console.print(f"[blue]Fetching contents at path: {path}")
-            contents = self.repo.get_contents(path)
-            console.print(f"[blue]Found {len(contents)} items at path: {path}")
+            console.print(f"[blue]Fetching file tree for branch: {self.repo.default_branch}")
+            # Pin the branch to a commit so raw downloads match the tree's blobs
+            self._commit_sha = self.repo.get_branch(self.repo.default_branch).commit.sha
+            tree = self.repo.get_git_tree(self._commit_sha, recursive=True)
             
-            for content in contents:
-                console.print(f"[blue]Processing: {content.path} (type: {content.type})")
+            # Git objects are content-addressed, so an unchanged tree SHA means
+            # every stored file is still current
+            if previous_tree_sha and tree.sha == previous_tree_sha:
+                console.print("[green]Repository contents are unchanged since the last fetch")
+                return tree.sha
                 
-                if content.type == "dir":
-                    # Recursively fetch directory contents
-                    self._fetch_repository_contents(content.path)
-                elif content.type == "file":
-                    # Skip large files and binary files
-                    if self._should_skip_file(content.path, content.size):
-                        console.print(f"[yellow]Skipping file: {content.path} (size: {content.size} bytes)")
-                        continue
-                        
-                    try:
-                        # Get file content
-                        console.print(f"[blue]Decoding content for: {content.path}")
-                        file_content = content.decoded_content.decode('utf-8')
+            truncated = bool(tree.raw_data.get("truncated"))
+            if truncated:
+                console.print("[yellow]Warning: repository tree is too large and was truncated by GitHub")
+                
+            blobs = [entry for entry in tree.tree if entry.type == "blob"]
+            console.print(f"[blue]Found {len(blobs)} files")
+            
+            # Skip large files, binary files and files whose stored copy is current
+            stored_shas = self.mongodb.get_file_shas(self.repo_id)
+            kept_paths = set()
+            wanted = []
+            for entry in blobs:
+                if self._should_skip_file(entry.path, entry.size):
+                    logger.debug("Skipping file: %s (size: %s bytes)", entry.path, entry.size)
+                    continue
+                kept_paths.add(entry.path)
+                if stored_shas.get(entry.path) != entry.sha:
+                    wanted.append(entry)
+            console.print(f"[blue]{len(wanted)} files are new or changed")
+            
+            # Remove stored files that are gone from the tree (a truncated tree
+            # does not list everything, so nothing can be concluded from it)
+            if not truncated:
+                stale_paths = [path for path in stored_shas if path not in kept_paths]
+                if stale_paths:
+                    self.mongodb.delete_files(self.repo_id, stale_paths)
+                    
+            self._failed_paths = []
+            self._stored_count = 0
+            download_task = None
+            if progress is not None:
+                download_task = progress.add_task("[green]Downloading files...", total=len(wanted))
+                
+            # Download blobs in parallel, keeping at most _MAX_IN_FLIGHT_BLOBS
+            # submitted at a time to bound memory; results are buffered and
+            # handed in batches of _WRITE_BATCH_SIZE to a single writer thread,
+            # so MongoDB writes stay serialized but overlap the downloads
+            batch = []
+            self._thread_local = threading.local()
+            self._pending_write = None
+            with ThreadPoolExecutor(max_workers=1) as writer, ThreadPoolExecutor(max_workers=_FETCH_WORKERS) as executor:
+                self._writer = writer
+                pending = set()
+                for entry in wanted:
+                    if len(pending) >= _MAX_IN_FLIGHT_BLOBS:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self._add_to_batch(batch, *future.result())
+                        if download_task is not None:
+                            progress.update(download_task, advance=len(done))
+                    pending.add(executor.submit(self._fetch_blob, entry))
+                    
+                for future in as_completed(pending):
+                    self._add_to_batch(batch, *future.result())
+                    if download_task is not None:
+                        progress.update(download_task, advance=1)
                         
-                        # Store file content in MongoDB
-                        console.print(f"[blue]Storing content for: {content.path}")
-                        self.mongodb.store_file_content(self.repo_id, content.path, file_content)
-                        console.print(f"[green]Successfully stored: {content.path}")
-                    except UnicodeDecodeError:
-                        console.print(f"[yellow]Skipping binary file: {content.path}")
-                    except Exception as e:
-                        console.print(f"[red]Error fetching file {content.path}: {e}")
+                self._flush_batch(batch)
+            self._writer = None
+            console.print(f"[green]Stored {self._stored_count} files")
+            
+            if truncated or self._failed_paths:
+                return None
+            return tree.sha
         except github.GithubException as e:
-            console.print(f"[red]GitHub API Error fetching contents at {path}: {e.status} - {e.data.get('message', '')}")
+            console.print(f"[red]GitHub API Error fetching repository tree: {e.status} - {e.data.get('message', '')}")
         except Exception as e:
-            console.print(f"[red]Error fetching contents at {path}: {e}")
+            console.print(f"[red]Error fetching repository tree: {e}")
+        return None
             
+    def _fetch_blob(self, entry: Any) -> Tuple[Any, Optional[str]]:
+        """
+        Download and decode the content of a blob.
+        
+        The raw content endpoint is tried first; the blob API is the fallback.
+        
+        Args:
+            entry: Git tree entry of the file
+            
+        Returns:
+            Tuple[Any, Optional[str]]: (entry, content), with content None if the
+            file is binary or could not be fetched
+        """
+        try:
+            repo = self._get_thread_repo()
+            raw_url = _RAW_CONTENT_URL.format(full_name=self.repo.full_name, ref=self._commit_sha, path=quote(entry.path))
+            try:
+                response = self._http.get(raw_url, headers=self._thread_local.headers, timeout=_RAW_TIMEOUT)
+            except requests.RequestException as e:
+                logger.debug("Raw download failed for %s: %s", entry.path, e)
+                response = None
+            if response is not None and response.status_code == 200:
+                return entry, response.content.decode('utf-8')
+                
+            blob = repo.get_git_blob(entry.sha)
+            return entry, base64.b64decode(blob.content).decode('utf-8')
+        except UnicodeDecodeError:
+            logger.debug("Skipping binary file: %s", entry.path)
+        except Exception as e:
+            logger.warning("Error fetching file %s: %s", entry.path, e)
+            self._failed_paths.append(entry.path)
+        return entry, None
+        
+    def _add_to_batch(self, batch: List[Dict[str, Any]], entry: Any, file_content: Optional[str]) -> None:
+        """
+        Buffer a downloaded file for storage, flushing the batch once it is full.
+        
+        Args:
+            batch: Pending file documents
+            entry: Git tree entry of the file
+            file_content: Decoded content, or None to skip the file
+        """
+        if file_content is None:
+            return
+            
+        batch.append({
+            "path": entry.path,
+            "content": file_content,
+            "size": entry.size,
+            "sha": entry.sha,
+            "signature": trigram_signature(file_content)
+        })
+        if len(batch) >= _WRITE_BATCH_SIZE:
+            self._flush_batch(batch)
+            
+    def _flush_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Hand the buffered files to the writer thread (or store them directly
+        when there is none) and empty the batch.
+        
+        Args:
+            batch: Pending file documents
+        """
+        if not batch:
+            return
+            
+        docs = batch[:]
+        del batch[:]
+        if self._writer is None:
+            self._store_batch(docs)
+            return
+            
+        # Wait for the previous write, so that at most one batch is being
+        # written while the next one fills up
+        if self._pending_write is not None:
+            self._pending_write.result()
+        self._pending_write = self._writer.submit(self._store_batch, docs)
+        
+    def _store_batch(self, docs: List[Dict[str, Any]]) -> None:
+        """
+        Store file documents in MongoDB, counting the stored files and
+        recording the paths that failed.
+        
+        Args:
+            docs: File documents
+        """
+        try:
+            failed_paths = self.mongodb.store_file_contents_bulk(self.repo_id, docs)
+            self._failed_paths.extend(failed_paths)
+            self._stored_count += len(docs) - len(failed_paths)
+        except Exception as e:
+            console.print(f"[red]Error storing {len(docs)} files: {e}")
+            self._failed_paths.extend(doc["path"] for doc in docs)
+        
     def _should_skip_file(self, path: str, size: int) -> bool:
         """
         Determine if a file should be skipped based on its path and size.
@@ -192,21 +471,25 @@ class GitHandler:
             bool: True if the file should be skipped, False otherwise
         """
         # Skip files larger than 1MB
-        if size > 1024 * 1024:
+        if size > _MAX_FILE_BYTES:
             return True
             
         # Skip common binary file types
-        binary_extensions = [
-            '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.svg',
-            '.pdf', '.zip', '.tar', '.gz', '.rar', '.7z',
-            '.exe', '.dll', '.so', '.dylib',
-            '.pyc', '.pyo', '.pyd',
-            '.mp3', '.mp4', '.avi', '.mov', '.flv',
-            '.ttf', '.woff', '.woff2', '.eot'
-        ]
-        
-        return any(path.lower().endswith(ext) for ext in binary_extensions)
+        return path.lower().endswith(_BIN_EXTS)
         
+    def build_search_index(self) -> None:
+        """Build the BM25 index over the stored files and persist it."""
+        if not self.repo_id:
+            raise ValueError("Repository not fetched yet")
+            
+        try:
+            console.print("[blue]Building search index...")
+            search_index = BM25Index.build(self.mongodb.iter_file_contents(self.repo_id))
+            search_index.save(index_path(self.repo_id))
+            console.print(f"[green]Search index built over {len(search_index.doc_ids)} files")
+        except Exception as e:
+            console.print(f"[yellow]Warning: could not build search index: {e}")
+            
     def get_file_content(self, file_path: str) -> Optional[str]:
         """
         Get the content of a file from MongoDB.
@@ -222,6 +505,36 @@ class GitHandler:
             
         return self.mongodb.get_file_content(self.repo_id, file_path)
         
+    def get_file_contents(self, file_paths: Iterable[str]) -> Dict[str, str]:
+        """
+        Get the contents of several files from MongoDB in one round-trip.
+        
+        Args:
+            file_paths: Paths to the files
+            
+        Returns:
+            Dict[str, str]: Mapping of file path to content, for the files that were found
+        """
+        if not self.repo_id:
+            raise ValueError("Repository not fetched yet")
+            
+        return self.mongodb.get_file_contents(self.repo_id, file_paths)
+        
+    def iter_file_contents(self, file_paths: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """
+        Stream the contents of several files from MongoDB with one query.
+        
+        Args:
+            file_paths: Paths to the files
+            
+        Yields:
+            Tuple[str, str]: (file path, content), for the files that were found
+        """
+        if not self.repo_id:
+            raise ValueError("Repository not fetched yet")
+            
+        return self.mongodb.iter_file_contents(self.repo_id, file_paths)
+        
     def get_all_files(self) -> List[str]:
         """
         Get all file paths in the repository from MongoDB.
@@ -232,7 +545,22 @@ class GitHandler:
         if not self.repo_id:
             raise ValueError("Repository not fetched yet")
             
-        return self.mongodb.get_all_files(self.repo_id)
+        # The paths only change when the repository is fetched, which clears this cache
+        if self._files_cache is None or self._files_cache[0] != self.repo_id:
+            self._files_cache = (self.repo_id, self.mongodb.get_all_files(self.repo_id))
+        return self._files_cache[1]
+        
+    def get_file_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get metadata (e.g. size) for all files in the repository from MongoDB.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Mapping of file path to metadata ("size", "signature")
+        """
+        if not self.repo_id:
+            raise ValueError("Repository not fetched yet")
+            
+        return self.mongodb.get_file_metadata(self.repo_id)
         
     def get_repository_structure(self) -> Dict[str, Any]:
         """
@@ -247,17 +575,32 @@ class GitHandler:
         files = self.get_all_files()
         structure = {}
         
-        for file_path in files:
+        # Sorting keeps all files of a directory together, so each file can reuse
+        # the chain of directory dicts built for the previous one and only
+        # create the directories where its path diverges
+        prev_dirs = []
+        chain = [structure]  # chain[i] is the dict for prev_dirs[:i]
+        
+        for file_path in sorted(files):
             parts = file_path.split('/')
-            current = structure
-            
-            # Build the nested structure
-            for i, part in enumerate(parts):
-                if i == len(parts) - 1:  # Last part (file)
-                    current[part] = file_path
-                else:  # Directory
-                    if part not in current:
-                        current[part] = {}
-                    current = current[part]
+            dirs = parts[:-1]
+            
+            # Number of leading directories shared with the previous file
+            common = 0
+            for prev_part, part in zip(prev_dirs, dirs):
+                if prev_part != part:
+                    break
+                common += 1
+                
+            # Build the nested structure for the diverging directories
+            del chain[common + 1:]
+            current = chain[-1]
+            for part in dirs[common:]:
+                current[part] = {}
+                current = current[part]
+                chain.append(current)
+                
+            current[parts[-1]] = file_path  # Last part (file)
+            prev_dirs = dirs
                     
         return structure
@@ -2,18 +2,24 @@
 Main module for Git-Claude-Chat CLI.
 """
 import os
+import re
 import sys
+import shutil
+import logging
+import functools
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Pattern
 import typer
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.markdown import Markdown
+from rich.logging import RichHandler
 
 from src.git_handler import GitHandler
 from src.claude_client import ClaudeClient
 from src.file_selector import FileSelector
-from src.mongodb_handler import MongoDBHandler
+from src.bm25_index import BM25Index, index_path
+from src.mongodb_handler import get_mongodb_handler
 
 # Load environment variables from .env file
 # Get the directory of the current script
@@ -27,6 +33,119 @@ console = Console()
 # Global state to store the current repository ID
 REPO_ID = None
 
+@app.callback()
+def main(
+    verbose: bool = typer.Option(
+        False, "--verbose", "-v", help="Show per-file progress details"
+    ),
+):
+    """
+    Git-Claude-Chat: Chat with GitHub repositories using Claude AI
+    """
+    # Per-file details are logged at DEBUG level; without --verbose they are
+    # filtered out before any formatting happens
+    logging.basicConfig(
+        level=logging.WARNING, format="%(message)s", handlers=[RichHandler(console=console, show_path=False)]
+    )
+    if verbose:
+        logging.getLogger("src").setLevel(logging.DEBUG)
+        
+    # Every command uses MongoDB; connect up front so that an unreachable
+    # server is reported once, before the command starts its work
+    get_mongodb_handler().warmup()
+
+@functools.lru_cache(maxsize=1)
+def _last_repo_file() -> Path:
+    """Return the path of the file storing the last fetched repository ID."""
+    return Path.home() / ".git-claude-chat" / "last_repo.txt"
+
+def _read_config_line(path: Path) -> str:
+    """Read a small single-line config file without buffered text I/O."""
+    fd = os.open(str(path), os.O_RDONLY)
+    try:
+        data = os.read(fd, 4096)
+    finally:
+        os.close(fd)
+    return data.decode("ascii").strip()
+
+@functools.lru_cache(maxsize=1)
+def _load_last_repo_id() -> Optional[str]:
+    """Return the last fetched repository ID from the config file, if any."""
+    # Just try the read; a separate exists() check would cost another stat call
+    try:
+        return _read_config_line(_last_repo_file())
+    except FileNotFoundError:
+        return None
+
+def _resolve_repo_id(repo_id: Optional[str], owner: Optional[str], repo: Optional[str]) -> Optional[str]:
+    """
+    Determine the repository a command applies to.
+    
+    Args:
+        repo_id: Repository ID given on the command line
+        owner: Repository owner given on the command line
+        repo: Repository name given on the command line
+        
+    Returns:
+        Optional[str]: Repository ID, or None if no repository could be determined
+    """
+    target_repo_id = repo_id or REPO_ID
+    
+    # If owner and repo are provided, try to find the repository in MongoDB
+    if not target_repo_id and owner and repo:
+        mongodb = get_mongodb_handler()
+        repo_info = mongodb.get_repository_by_name(owner, repo)
+        if repo_info:
+            target_repo_id = str(repo_info["_id"])
+    
+    if not target_repo_id:
+        # Try to load from config
+        target_repo_id = _load_last_repo_id()
+        
+    return target_repo_id
+
+def _compile_ignore_patterns(ignore_patterns: Optional[List[str]]) -> Optional[Pattern]:
+    """
+    Compile ignore patterns into one regex matching paths that contain any of them.
+    
+    Args:
+        ignore_patterns: Substrings; a path containing any of them is ignored
+        
+    Returns:
+        Optional[Pattern]: Compiled alternation, or None if there are no patterns
+    """
+    if not ignore_patterns:
+        return None
+    return re.compile("|".join(re.escape(pattern) for pattern in ignore_patterns))
+
+def _make_file_selector(repo_id: str, full_name: str, with_index: bool = True) -> FileSelector:
+    """
+    Create the file selector of a repository, with the search index persisted
+    at fetch time if there is one.
+    
+    Args:
+        repo_id: Repository ID
+        full_name: Full name of the repository (owner/repo)
+        with_index: Whether to load the search index (only query ranking uses it)
+        
+    Returns:
+        FileSelector: Selector reading file contents from MongoDB
+    """
+    mongodb = get_mongodb_handler()
+    
+    # Rank files with the search index built at fetch time, or score their
+    # stored contents without one
+    search_index = BM25Index.load(index_path(repo_id)) if with_index else None
+    if with_index and search_index is None:
+        console.print("[yellow]No search index found; run 'fetch' again to build one. Scoring all files instead.")
+        
+    return FileSelector(
+        full_name,
+        functools.partial(mongodb.get_file_content, repo_id),
+        search_index,
+        functools.partial(mongodb.get_file_contents, repo_id)
+    )
+
 @app.command("fetch")
 def fetch_repository(
     repo_url: str = typer.Argument(..., help="URL of the GitHub repository to fetch"),
@@ -51,11 +170,12 @@ def fetch_repository(
         REPO_ID = git_handler.fetch_repository(force=force)
         
         # Save the repository ID to a config file for future use
-        config_dir = Path.home() / ".git-claude-chat"
-        config_dir.mkdir(exist_ok=True)
+        config_file = _last_repo_file()
+        config_file.parent.mkdir(exist_ok=True)
         
-        with open(config_dir / "last_repo.txt", "w") as f:
+        with open(config_file, "w") as f:
             f.write(REPO_ID)
+        _load_last_repo_id.cache_clear()
             
         console.print(f"[green]Repository fetched successfully with ID: {REPO_ID}")
         console.print("[yellow]You can now use the 'chat' command to interact with the codebase")
@@ -94,31 +214,15 @@ def chat_with_codebase(
     """
     Chat with Claude about the codebase.
     """
-    global REPO_ID
-    
     # Determine the repository ID
-    target_repo_id = repo_id or REPO_ID
-    
-    # If owner and repo are provided, try to find the repository in MongoDB
-    if not target_repo_id and owner and repo:
-        mongodb = MongoDBHandler()
-        repo_info = mongodb.get_repository_by_name(owner, repo)
-        if repo_info:
-            target_repo_id = str(repo_info["_id"])
-    
-    if not target_repo_id:
-        # Try to load from config
-        config_file = Path.home() / ".git-claude-chat" / "last_repo.txt"
-        if config_file.exists():
-            with open(config_file, "r") as f:
-                target_repo_id = f.read().strip()
+    target_repo_id = _resolve_repo_id(repo_id, owner, repo)
         
     if not target_repo_id:
         console.print("[red]No repository specified. Use the 'fetch' command first or specify a repository with --repo-id, or --owner and --repo")
         sys.exit(1)
         
     # Initialize the MongoDB handler
-    mongodb = MongoDBHandler()
+    mongodb = get_mongodb_handler()
     
     # Get repository info
     repo_info = mongodb.get_repository_info(target_repo_id)
@@ -131,8 +235,17 @@ def chat_with_codebase(
     git_handler.repo_id = target_repo_id
     
     try:
-        # Get the list of files
-        all_files = git_handler.get_all_files()
+        # Create the file selector of the repository
+        file_selector = _make_file_selector(target_repo_id, repo_info["full_name"])
+        
+        # Ranking with the search index only needs the paths; sizes and
+        # signatures are only used when every file is scored instead
+        if file_selector.search_index is not None:
+            file_metadata = None
+            all_files = git_handler.get_all_files()
+        else:
+            file_metadata = git_handler.get_file_metadata()
+            all_files = list(file_metadata)
         
         if not all_files:
             console.print("[red]No files found in the repository")
@@ -140,13 +253,10 @@ def chat_with_codebase(
             
         console.print(f"[green]Found {len(all_files)} files in the repository")
         
-        # Initialize the file selector
-        file_selector = FileSelector(repo_info["full_name"])
-        
         # Get the most relevant files for the query
         console.print(f"[yellow]Selecting relevant files for: {message}")
         relevant_files, token_count = file_selector.get_relevant_files(
-            message, all_files, max_files, max_tokens_context
+            message, all_files, max_files, max_tokens_context, file_metadata
         )
         
         if not relevant_files:
@@ -155,12 +265,9 @@ def chat_with_codebase(
             
         console.print(f"[green]Selected {len(relevant_files)} relevant files (approx. {token_count} tokens)")
         
-        # Prepare the files dictionary for Claude
-        files_dict = {}
-        for file_path, _ in relevant_files.items():
-            content = git_handler.get_file_content(file_path)
-            if content:
-                files_dict[file_path] = content
+        # Prepare the files dictionary for Claude; the selector already read
+        # the contents of the files it picked
+        files_dict = relevant_files
                 
         # Initialize the Claude client
         claude_client = ClaudeClient()
@@ -209,31 +316,15 @@ def analyze_codebase(
     """
     Get a general analysis of the codebase.
     """
-    global REPO_ID
-    
     # Determine the repository ID
-    target_repo_id = repo_id or REPO_ID
-    
-    # If owner and repo are provided, try to find the repository in MongoDB
-    if not target_repo_id and owner and repo:
-        mongodb = MongoDBHandler()
-        repo_info = mongodb.get_repository_by_name(owner, repo)
-        if repo_info:
-            target_repo_id = str(repo_info["_id"])
-    
-    if not target_repo_id:
-        # Try to load from config
-        config_file = Path.home() / ".git-claude-chat" / "last_repo.txt"
-        if config_file.exists():
-            with open(config_file, "r") as f:
-                target_repo_id = f.read().strip()
+    target_repo_id = _resolve_repo_id(repo_id, owner, repo)
         
     if not target_repo_id:
         console.print("[red]No repository specified. Use the 'fetch' command first or specify a repository with --repo-id, or --owner and --repo")
         sys.exit(1)
         
     # Initialize the MongoDB handler
-    mongodb = MongoDBHandler()
+    mongodb = get_mongodb_handler()
     
     # Get repository info
     repo_info = mongodb.get_repository_info(target_repo_id)
@@ -255,8 +346,8 @@ def analyze_codebase(
             
         console.print(f"[green]Found {len(all_files)} files in the repository")
         
-        # Initialize the file selector
-        file_selector = FileSelector(repo_info["full_name"])
+        # Create the file selector of the repository
+        file_selector = _make_file_selector(target_repo_id, repo_info["full_name"], with_index=False)
         
         # Get a representative sample of files
         console.print("[yellow]Selecting representative files for analysis...")
@@ -270,12 +361,9 @@ def analyze_codebase(
             
         console.print(f"[green]Selected {len(relevant_files)} representative files (approx. {token_count} tokens)")
         
-        # Prepare the files dictionary for Claude
-        files_dict = {}
-        for file_path, _ in relevant_files.items():
-            content = git_handler.get_file_content(file_path)
-            if content:
-                files_dict[file_path] = content
+        # Prepare the files dictionary for Claude; the selector already read
+        # the contents of the files it picked
+        files_dict = relevant_files
                 
         # Initialize the Claude client
         claude_client = ClaudeClient()
@@ -321,31 +409,15 @@ def list_files(
     """
     List all files in the repository.
     """
-    global REPO_ID
-    
     # Determine the repository ID
-    target_repo_id = repo_id or REPO_ID
-    
-    # If owner and repo are provided, try to find the repository in MongoDB
-    if not target_repo_id and owner and repo:
-        mongodb = MongoDBHandler()
-        repo_info = mongodb.get_repository_by_name(owner, repo)
-        if repo_info:
-            target_repo_id = str(repo_info["_id"])
-    
-    if not target_repo_id:
-        # Try to load from config
-        config_file = Path.home() / ".git-claude-chat" / "last_repo.txt"
-        if config_file.exists():
-            with open(config_file, "r") as f:
-                target_repo_id = f.read().strip()
+    target_repo_id = _resolve_repo_id(repo_id, owner, repo)
         
     if not target_repo_id:
         console.print("[red]No repository specified. Use the 'fetch' command first or specify a repository with --repo-id, or --owner and --repo")
         sys.exit(1)
         
     # Initialize the MongoDB handler
-    mongodb = MongoDBHandler()
+    mongodb = get_mongodb_handler()
     
     # Get repository info
     repo_info = mongodb.get_repository_info(target_repo_id)
@@ -353,29 +425,17 @@ def list_files(
         console.print(f"[red]Repository with ID {target_repo_id} not found in the database")
         sys.exit(1)
         
-    # Initialize the Git handler
-    git_handler = GitHandler(owner=repo_info["owner"], repo=repo_info["name"])
-    git_handler.repo_id = target_repo_id
-    
     try:
-        # Get the list of files
-        all_files = git_handler.get_all_files()
+        # Get the sorted list of files, filtered by the ignore patterns in MongoDB
+        all_files = mongodb.get_filtered_file_paths(target_repo_id, _compile_ignore_patterns(ignore_patterns))
         
-        if not all_files:
+        if not all_files and not ignore_patterns:
             console.print("[red]No files found in the repository")
             sys.exit(1)
             
-        # Filter files based on ignore patterns
-        if ignore_patterns:
-            filtered_files = []
-            for file_path in all_files:
-                if not any(pattern in file_path for pattern in ignore_patterns):
-                    filtered_files.append(file_path)
-            all_files = filtered_files
-            
         # Print the files
         console.print(f"[green]Found {len(all_files)} files in the repository:")
-        for file_path in sorted(all_files):
+        for file_path in all_files:
             console.print(f"  {file_path}")
             
     except Exception as e:
@@ -403,28 +463,14 @@ def delete_repository(
     global REPO_ID
     
     # Determine the repository ID
-    target_repo_id = repo_id or REPO_ID
-    
-    # If owner and repo are provided, try to find the repository in MongoDB
-    if not target_repo_id and owner and repo:
-        mongodb = MongoDBHandler()
-        repo_info = mongodb.get_repository_by_name(owner, repo)
-        if repo_info:
-            target_repo_id = str(repo_info["_id"])
-    
-    if not target_repo_id:
-        # Try to load from config
-        config_file = Path.home() / ".git-claude-chat" / "last_repo.txt"
-        if config_file.exists():
-            with open(config_file, "r") as f:
-                target_repo_id = f.read().strip()
+    target_repo_id = _resolve_repo_id(repo_id, owner, repo)
         
     if not target_repo_id:
         console.print("[red]No repository specified. Use the 'fetch' command first or specify a repository with --repo-id, or --owner and --repo")
         sys.exit(1)
         
     # Initialize the MongoDB handler
-    mongodb = MongoDBHandler()
+    mongodb = get_mongodb_handler()
     
     # Get repository info
     repo_info = mongodb.get_repository_info(target_repo_id)
@@ -446,14 +492,19 @@ def delete_repository(
         if success:
             console.print(f"[green]Repository {repo_info['full_name']} deleted successfully")
             
+            # Remove the repository's search index as well
+            shutil.rmtree(str(index_path(target_repo_id).parent), ignore_errors=True)
+            
             # If we deleted the global repo, update it
             if REPO_ID == target_repo_id:
                 REPO_ID = None
                 
                 # Also clear the config file if it exists
-                config_file = Path.home() / ".git-claude-chat" / "last_repo.txt"
-                if config_file.exists():
-                    config_file.unlink()
+                try:
+                    _last_repo_file().unlink()
+                except FileNotFoundError:
+                    pass
+                _load_last_repo_id.cache_clear()
         else:
             console.print("[red]Failed to delete repository")
             sys.exit(1)
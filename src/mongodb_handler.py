@@ -2,15 +2,165 @@
 MongoDB handler for Git-Claude-Chat.
 """
 import os
-from typing import Dict, List, Optional, Any
-from pymongo import MongoClient
+import logging
+import hashlib
+import importlib.util
+import time
+import functools
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Any
+import gridfs
+from bson.objectid import ObjectId
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
+from pymongo.write_concern import WriteConcern
 from rich.console import Console
 
+logger = logging.getLogger(__name__)
 console = Console()
 
+# File contents larger than this (in bytes) are stored in GridFS instead of
+# inline in the file document
+_GRIDFS_THRESHOLD = 64 * 1024
+
+# Repository fields returned by lookups (plus _id); these are all the callers use
+_REPO_INFO_PROJECTION = {"full_name": 1, "name": 1, "owner": 1, "default_branch": 1, "tree_sha": 1}
+
+# Source code compresses well, so the collections holding file contents are
+# created with WiredTiger's zstd block compressor (the default is snappy)
+_COMPRESSED_COLLECTIONS = ("files", "file_blobs.chunks")
+_ZSTD_STORAGE_ENGINE = {"wiredTiger": {"configString": "block_compressor=zstd"}}
+
+# Index keys; queries on them pass the index as a hint, so the server uses it
+# without running (or mis-caching) query planning
+_FILE_INDEX = [("repo_id", 1), ("path", 1)]
+_REPO_NAME_INDEX = [("full_name", 1)]
+_ID_INDEX = "_id_"
+
+# Documents per cursor batch for scans that return only small fields (paths,
+# sizes, SHAs); the server's default first batch is only 101 documents
+_SCAN_BATCH_SIZE = 5000
+
+# Server error codes of a unique index violation and of creating a collection
+# that already exists
+_DUPLICATE_KEY = 11000
+_NAMESPACE_EXISTS = 48
+
+# Largest number of files sent in one bulk write
+_BULK_WRITE_CHUNK = 1000
+
+# Connection pool sizing; a few connections are kept open so that commands
+# and the fetch's writer thread do not pay for connection setup
+_MAX_POOL_SIZE = 50
+_MIN_POOL_SIZE = 5
+
+# Fail fast when the server is unreachable instead of after 30 seconds
+_SERVER_SELECTION_TIMEOUT_MS = 2000
+
+# Wire protocol compressors in order of preference, with the module each needs;
+# zlib is in the standard library, the others are used when installed
+_WIRE_COMPRESSORS = (("zstd", "zstandard"), ("snappy", "snappy"), ("zlib", "zlib"))
+
+# Repository documents are cached briefly; file contents until a write touches them
+_REPO_CACHE_SIZE = 64
+_REPO_CACHE_TTL = 60.0
+_CONTENT_CACHE_BYTES = 64 * 1024 * 1024
+
+_MISSING = object()
+
+class _LRUCache:
+    """Thread-safe LRU cache bounded by total entry weight, with optional expiry."""
+    
+    def __init__(self, max_weight: int, ttl: Optional[float] = None, weigh=lambda value: 1):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_weight: Maximum total weight of the cached entries
+            ttl: Seconds an entry stays valid (forever if None)
+            weigh: Callable returning the weight of a value
+        """
+        self.max_weight = max_weight
+        self.ttl = ttl
+        self.weigh = weigh
+        self._entries = OrderedDict()  # key -> (value, weight, expiry time)
+        self._weight = 0
+        self._lock = threading.Lock()
+        
+    def get(self, key: Any) -> Any:
+        """Return the cached value for key, or _MISSING."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[2] is not None and entry[2] < time.monotonic():
+                self._remove(key)
+                return _MISSING
+            self._entries.move_to_end(key)
+            return entry[0]
+            
+    def put(self, key: Any, value: Any) -> None:
+        """Cache a value, evicting the least recently used entries if needed."""
+        weight = self.weigh(value)
+        if weight > self.max_weight:
+            return
+        expiry = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, weight, expiry)
+            self._weight += weight
+            while self._weight > self.max_weight:
+                self._remove(next(iter(self._entries)))
+                
+    def pop(self, key: Any) -> None:
+        """Drop the entry for key, if any."""
+        with self._lock:
+            self._remove(key)
+            
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+            
+    def _remove(self, key: Any) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._weight -= entry[1]
+
+def _content_hash(content: str) -> str:
+    """
+    Hash file content to detect unchanged files.
+    
+    Args:
+        content: Content of the file
+        
+    Returns:
+        str: Hex digest of the content
+    """
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+    
+def _wire_compressors() -> str:
+    """
+    Get the wire protocol compressors to offer the server.
+    
+    Returns:
+        str: Comma-separated names of the available compressors
+    """
+    return ",".join(name for name, module in _WIRE_COMPRESSORS if importlib.util.find_spec(module) is not None)
+    
+@functools.lru_cache(maxsize=128)
+def _oid(repo_id: str) -> ObjectId:
+    """Convert a repository ID string to an ObjectId, caching the result."""
+    return ObjectId(repo_id)
+
 class MongoDBHandler:
     """Handles MongoDB operations for storing repository data."""
     
+    # Indexes only need to be ensured once per process and database, not per handler
+    _indexed_databases = set()
+    
     def __init__(self, uri: Optional[str] = None, db_name: Optional[str] = None):
         """
         Initialize the MongoDB handler.
@@ -22,20 +172,135 @@ class MongoDBHandler:
         self.uri = uri or os.environ.get("MONGODB_URI", "mongodb://localhost:27017/")
         self.db_name = db_name or os.environ.get("MONGODB_DB", "git_claude_chat")
         self.client = None
-        self.db = None
+        self._db = None
+        self._bulk_files = None
+        self._fs = None
+        
+        # Repository documents keyed by ("id", repo_id) / ("name", full_name),
+        # and file contents keyed by (repo_id, path), bounded by content size
+        self._repo_cache = _LRUCache(_REPO_CACHE_SIZE, ttl=_REPO_CACHE_TTL)
+        self._content_cache = _LRUCache(_CONTENT_CACHE_BYTES, weigh=len)
         
         self._connect()
         
     def _connect(self) -> None:
-        """Connect to MongoDB."""
+        """
+        Create the MongoDB client.
+        
+        MongoClient connects lazily, so this needs no server; the first
+        operation (or warmup) connects, and the first use of the database
+        creates its indexes.
+        """
         try:
-            self.client = MongoClient(self.uri)
-            self.db = self.client[self.db_name]
-            console.print("[green]Connected to MongoDB successfully")
+            self.client = MongoClient(
+                self.uri,
+                maxPoolSize=_MAX_POOL_SIZE,
+                minPoolSize=_MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=_SERVER_SELECTION_TIMEOUT_MS,
+                compressors=_wire_compressors()
+            )
+            self._db = self.client[self.db_name]
+            # File contents can always be fetched again from GitHub, so bulk
+            # writes of them are acknowledged without waiting for the journal
+            self._bulk_files = self._db.files.with_options(write_concern=WriteConcern(w=1, j=False))
+            self._fs = gridfs.GridFS(self._db, collection="file_blobs")
+            logger.debug("MongoDB client created for database %s", self.db_name)
         except Exception as e:
             console.print(f"[red]Error connecting to MongoDB: {e}")
             raise
             
+    # Queries hint the unique indexes and the content upserts rely on them, so
+    # every access to the database goes through these properties, which create
+    # the indexes first
+    
+    @property
+    def db(self) -> Any:
+        """Database, with its indexes created."""
+        self._create_indexes()
+        return self._db
+        
+    @property
+    def bulk_files(self) -> Any:
+        """Files collection with the bulk write concern, with the indexes created."""
+        self._create_indexes()
+        return self._bulk_files
+        
+    @property
+    def fs(self) -> gridfs.GridFS:
+        """GridFS store of large file contents, with the indexes created."""
+        self._create_indexes()
+        return self._fs
+        
+    def warmup(self) -> bool:
+        """
+        Open a connection to the server ahead of the first query.
+        
+        MongoClient connects lazily; a ping runs server discovery and opens a
+        pooled connection so that the first real operation does not pay for it.
+        Best effort: a failure is only reported.
+        
+        Returns:
+            bool: True if the server answered, False otherwise
+        """
+        try:
+            self.client.admin.command("ping")
+            return True
+        except Exception as e:
+            console.print(f"[yellow]Warning: could not reach MongoDB: {e}")
+            return False
+            
+    def _create_indexes(self) -> None:
+        """
+        Create the indexes used by file lookups and repository upserts, once
+        per process and database.
+        
+        Raises:
+            Exception: If a unique index cannot be created; storing files and
+                repositories relies on them
+        """
+        if (self.uri, self.db_name) in MongoDBHandler._indexed_databases:
+            return
+            
+        # Collections have to exist with their storage options before
+        # create_index would implicitly create them with the defaults
+        self._create_collections()
+        
+        try:
+            # Equality field (repo_id) first, so the index serves the {repo_id, path}
+            # point lookups as well as the {repo_id} prefix scans
+            self._db.files.create_index(_FILE_INDEX, unique=True)
+            self._db.repositories.create_index(_REPO_NAME_INDEX, unique=True)
+            MongoDBHandler._indexed_databases.add((self.uri, self.db_name))
+        except Exception as e:
+            console.print(f"[red]Error creating MongoDB indexes: {e}")
+            raise
+            
+    def _create_collections(self) -> None:
+        """
+        Create the collections holding file contents with zstd block compression.
+        
+        Compression is an optimization only: collections that already exist are
+        left as they are, and if the server rejects the storage option the
+        collection is created with the defaults when its first index is.
+        """
+        try:
+            existing = set(self._db.list_collection_names())
+        except Exception as e:
+            console.print(f"[yellow]Warning: could not list MongoDB collections: {e}")
+            return
+            
+        for name in _COMPRESSED_COLLECTIONS:
+            if name in existing:
+                continue
+            try:
+                self._db.create_collection(name, storageEngine=_ZSTD_STORAGE_ENGINE)
+            except CollectionInvalid:
+                # Created by another process since the listing
+                pass
+            except OperationFailure as e:
+                if e.code != _NAMESPACE_EXISTS:
+                    console.print(f"[yellow]Warning: could not create collection {name} with zstd compression: {e}")
+                
     def store_repository_info(self, repo_info: Dict[str, Any]) -> str:
         """
         Store repository information in MongoDB.
@@ -57,35 +322,246 @@ class MongoDBHandler:
             if result.upserted_id:
                 repo_id = str(result.upserted_id)
             else:
-                repo_doc = self.db.repositories.find_one({"full_name": repo_info["full_name"]})
+                repo_doc = self.db.repositories.find_one(
+                    {"full_name": repo_info["full_name"]}, {"_id": 1}, hint=_REPO_NAME_INDEX
+                )
                 repo_id = str(repo_doc["_id"])
                 
-            console.print(f"[green]Repository information stored in MongoDB with ID: {repo_id}")
+            self._repo_cache.clear()
+            logger.debug("Repository information stored in MongoDB with ID: %s", repo_id)
             return repo_id
         except Exception as e:
             console.print(f"[red]Error storing repository information: {e}")
             raise
             
-    def store_file_content(self, repo_id: str, file_path: str, content: str) -> None:
+    def store_file_content(
+        self, 
+        repo_id: str, 
+        file_path: str, 
+        content: str, 
+        size: Optional[int] = None, 
+        signature: Optional[bytes] = None
+    ) -> None:
         """
-        Store file content in MongoDB.
+        Store file content in MongoDB, unless the stored content is identical.
         
         Args:
             repo_id: Repository ID
             file_path: Path of the file
             content: Content of the file
+            size: Size of the file in bytes (computed from content if not given)
+            signature: Trigram signature of the content, used to skip files during selection
         """
+        if size is None:
+            size = len(content.encode('utf-8'))
+            
+        content_hash = _content_hash(content)
+        self._content_cache.pop((repo_id, file_path))
         try:
-            self.db.files.update_one(
-                {"repo_id": repo_id, "path": file_path},
-                {"$set": {"content": content}},
-                upsert=True
-            )
-            console.print(f"[green]File content stored for {file_path}")
+            stored = self._get_stored_files(repo_id, [file_path]).get(file_path, {})
+            if stored.get("hash") == content_hash:
+                return
+                
+            fields = self._content_fields(repo_id, file_path, content)
+            fields["size"] = size
+            fields["hash"] = content_hash
+            if signature is not None:
+                fields["signature"] = signature
+                
+            # The hash condition makes the update a no-op if the same content
+            # was stored in the meantime; the upsert then hits the unique
+            # (repo_id, path) index instead of inserting a second document for
+            # the path. _create_indexes fails hard without that index, so it
+            # always exists here
+            try:
+                self.db.files.update_one(
+                    {"repo_id": repo_id, "path": file_path, "hash": {"$ne": content_hash}},
+                    {"$set": fields},
+                    upsert=True
+                )
+            except DuplicateKeyError:
+                self._delete_blobs([fields["content_file_id"]])
+                return
+            except Exception:
+                self._delete_blobs([fields["content_file_id"]])
+                raise
+            self._delete_blobs([stored.get("content_file_id")])
         except Exception as e:
             console.print(f"[red]Error storing file content: {e}")
             raise
             
+    def _content_fields(self, repo_id: str, file_path: str, content: str) -> Dict[str, Any]:
+        """
+        Build the content fields of a file document, moving large contents to GridFS.
+        
+        Args:
+            repo_id: Repository ID
+            file_path: Path of the file
+            content: Content of the file
+            
+        Returns:
+            Dict[str, Any]: "content" and "content_file_id" fields (one of them None)
+        """
+        data = content.encode('utf-8')
+        if len(data) <= _GRIDFS_THRESHOLD:
+            return {"content": content, "content_file_id": None}
+        file_id = self.fs.put(data, repo_id=repo_id, path=file_path)
+        return {"content": None, "content_file_id": file_id}
+        
+    def _get_blob_ids(self, repo_id: str, file_paths: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get the GridFS IDs of stored file contents.
+        
+        Args:
+            repo_id: Repository ID
+            file_paths: Only look at these files (all files of the repository if None)
+            
+        Returns:
+            Dict[str, Any]: Mapping of file path to GridFS file ID
+        """
+        query = {"repo_id": repo_id, "content_file_id": {"$ne": None}}
+        if file_paths is not None:
+            query["path"] = {"$in": file_paths}
+        files = self.db.files.find(query, {"path": 1, "content_file_id": 1, "_id": 0})
+        return {file["path"]: file["content_file_id"] for file in files}
+        
+    def _get_stored_files(self, repo_id: str, file_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the content hashes and GridFS IDs of stored files.
+        
+        Args:
+            repo_id: Repository ID
+            file_paths: Paths of the files
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Mapping of file path to its "hash" and
+                "content_file_id" fields (stored files only)
+        """
+        files = self.db.files.find(
+            {"repo_id": repo_id, "path": {"$in": file_paths}},
+            {"path": 1, "hash": 1, "content_file_id": 1, "_id": 0}
+        )
+        return {file.pop("path"): file for file in files}
+        
+    def _delete_blobs(self, file_ids: Iterable[Any]) -> None:
+        """
+        Delete file contents from GridFS.
+        
+        Args:
+            file_ids: GridFS file IDs (None entries are ignored)
+        """
+        for file_id in file_ids:
+            if file_id is not None:
+                self.fs.delete(file_id)
+            
+    def update_repository_info(self, repo_id: str, fields: Dict[str, Any]) -> None:
+        """
+        Update fields of a stored repository.
+        
+        Args:
+            repo_id: Repository ID
+            fields: Fields to set
+        """
+        try:
+            self.db.repositories.update_one({"_id": _oid(repo_id)}, {"$set": fields})
+            self._repo_cache.clear()
+        except Exception as e:
+            console.print(f"[red]Error updating repository information: {e}")
+            
+    def store_file_contents_bulk(self, repo_id: str, docs: List[Dict[str, Any]]) -> List[str]:
+        """
+        Store the contents of many files in MongoDB with bulk writes of up to
+        _BULK_WRITE_CHUNK files each.
+        
+        Args:
+            repo_id: Repository ID
+            docs: File documents with "path", "content" and optionally "size",
+                "sha" and "signature" keys
+                
+        Returns:
+            List[str]: Paths of the files that could not be stored
+        """
+        failed_paths = []
+        for start in range(0, len(docs), _BULK_WRITE_CHUNK):
+            failed_paths.extend(self._store_file_contents_chunk(repo_id, docs[start:start + _BULK_WRITE_CHUNK]))
+        return failed_paths
+        
+    def _store_file_contents_chunk(self, repo_id: str, docs: List[Dict[str, Any]]) -> List[str]:
+        """
+        Store the contents of files in MongoDB with a single bulk write.
+        
+        Args:
+            repo_id: Repository ID
+            docs: File documents (see store_file_contents_bulk)
+            
+        Returns:
+            List[str]: Paths of the files that could not be stored
+        """
+        if not docs:
+            return []
+            
+        for doc in docs:
+            self._content_cache.pop((repo_id, doc["path"]))
+            
+        new_blob_ids = {}
+        try:
+            stored = self._get_stored_files(repo_id, [doc["path"] for doc in docs])
+            
+            # Files whose stored content is identical are not written at all. The
+            # hash condition of the upserts relies on the unique (repo_id, path)
+            # index as in store_file_content
+            changed = []
+            requests = []
+            for doc in docs:
+                fields = dict(doc)
+                content_hash = _content_hash(fields["content"])
+                if stored.get(fields["path"], {}).get("hash") == content_hash:
+                    continue
+                    
+                fields["hash"] = content_hash
+                if fields.get("size") is None:
+                    fields["size"] = len(fields["content"].encode('utf-8'))
+                fields.update(self._content_fields(repo_id, fields["path"], fields["content"]))
+                if fields["content_file_id"] is not None:
+                    new_blob_ids[fields["path"]] = fields["content_file_id"]
+                changed.append(fields["path"])
+                requests.append(UpdateOne(
+                    {"repo_id": repo_id, "path": fields["path"], "hash": {"$ne": content_hash}},
+                    {"$set": fields},
+                    upsert=True
+                ))
+                
+            if not requests:
+                return []
+                
+            # Unordered, so the server does not stop at (or serialize around) one failed write
+            failed_paths = []
+            unwritten = set()
+            try:
+                self.bulk_files.bulk_write(requests, ordered=False)
+                logger.debug("File content stored for %d files (%d unchanged)", len(changed), len(docs) - len(changed))
+            except BulkWriteError as e:
+                # The other writes of the batch went through; report only the failed ones.
+                # A duplicate key means the same content was stored in the meantime
+                for error in e.details.get("writeErrors", []):
+                    path = changed[error["index"]]
+                    unwritten.add(path)
+                    if error.get("code") != _DUPLICATE_KEY:
+                        console.print(f"[red]Error storing file content for {path}: {error.get('errmsg')}")
+                        failed_paths.append(path)
+                        
+            # Replaced contents are no longer referenced; contents of writes
+            # that did not happen never were
+            for path in changed:
+                if path not in unwritten:
+                    self._delete_blobs([stored.get(path, {}).get("content_file_id")])
+            self._delete_blobs(file_id for path, file_id in new_blob_ids.items() if path in unwritten)
+            return failed_paths
+        except Exception as e:
+            console.print(f"[red]Error storing file contents: {e}")
+            self._delete_blobs(new_blob_ids.values())
+            raise
+            
     def get_repository_info(self, repo_id: str) -> Optional[Dict[str, Any]]:
         """
         Get repository information from MongoDB.
@@ -94,12 +570,19 @@ class MongoDBHandler:
             repo_id: Repository ID
             
         Returns:
-            Optional[Dict[str, Any]]: Repository information or None if not found
+            Optional[Dict[str, Any]]: Repository information (the _REPO_INFO_PROJECTION
+            fields) or None if not found
         """
+        repo_info = self._repo_cache.get(("id", repo_id))
+        if repo_info is not _MISSING:
+            return dict(repo_info)
+            
         try:
-            from bson.objectid import ObjectId
-            repo_info = self.db.repositories.find_one({"_id": ObjectId(repo_id)})
-            return repo_info
+            repo_info = self.db.repositories.find_one({"_id": _oid(repo_id)}, _REPO_INFO_PROJECTION, hint=_ID_INDEX)
+            if repo_info is not None:
+                self._repo_cache.put(("id", repo_id), repo_info)
+                return dict(repo_info)
+            return None
         except Exception as e:
             console.print(f"[red]Error getting repository information: {e}")
             return None
@@ -113,12 +596,22 @@ class MongoDBHandler:
             repo: Repository name
             
         Returns:
-            Optional[Dict[str, Any]]: Repository information or None if not found
+            Optional[Dict[str, Any]]: Repository information (the _REPO_INFO_PROJECTION
+            fields) or None if not found
         """
+        full_name = f"{owner}/{repo}"
+        repo_info = self._repo_cache.get(("name", full_name))
+        if repo_info is not _MISSING:
+            return dict(repo_info)
+            
         try:
-            full_name = f"{owner}/{repo}"
-            repo_info = self.db.repositories.find_one({"full_name": full_name})
-            return repo_info
+            repo_info = self.db.repositories.find_one(
+                {"full_name": full_name}, _REPO_INFO_PROJECTION, hint=_REPO_NAME_INDEX
+            )
+            if repo_info is not None:
+                self._repo_cache.put(("name", full_name), repo_info)
+                return dict(repo_info)
+            return None
         except Exception as e:
             console.print(f"[red]Error getting repository by name: {e}")
             return None
@@ -134,13 +627,69 @@ class MongoDBHandler:
         Returns:
             Optional[str]: File content or None if not found
         """
+        content = self._content_cache.get((repo_id, file_path))
+        if content is not _MISSING:
+            return content
+            
         try:
-            file_doc = self.db.files.find_one({"repo_id": repo_id, "path": file_path})
-            return file_doc["content"] if file_doc else None
+            file_doc = self.db.files.find_one(
+                {"repo_id": repo_id, "path": file_path}, {"content": 1, "content_file_id": 1}
+            )
+            if not file_doc:
+                return None
+            if file_doc.get("content_file_id") is not None:
+                content = self.fs.get(file_doc["content_file_id"]).read().decode('utf-8')
+            else:
+                content = file_doc["content"]
+            self._content_cache.put((repo_id, file_path), content)
+            return content
         except Exception as e:
             console.print(f"[red]Error getting file content: {e}")
             return None
             
+    def get_file_contents(self, repo_id: str, file_paths: Iterable[str]) -> Dict[str, str]:
+        """
+        Get the contents of several files from MongoDB with a single query.
+        
+        Args:
+            repo_id: Repository ID
+            file_paths: Paths of the files
+            
+        Returns:
+            Dict[str, str]: Mapping of file path to content, for the files that were found
+        """
+        try:
+            return dict(self.iter_file_contents(repo_id, file_paths))
+        except Exception as e:
+            console.print(f"[red]Error getting file contents: {e}")
+            return {}
+            
+    def iter_file_contents(self, repo_id: str, file_paths: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate over file contents of a repository.
+        
+        Documents are streamed from a cursor, so only one batch of contents is
+        held in memory at a time.
+        
+        Args:
+            repo_id: Repository ID
+            file_paths: Only these files, fetched with a single $in query (all
+                files of the repository if None)
+            
+        Yields:
+            Tuple[str, str]: (file path, content)
+        """
+        query = {"repo_id": repo_id}
+        if file_paths is not None:
+            query["path"] = {"$in": list(file_paths)}
+            
+        files = self.db.files.find(query, {"path": 1, "content": 1, "content_file_id": 1, "_id": 0})
+        for file_doc in files:
+            if file_doc.get("content_file_id") is not None:
+                yield file_doc["path"], self.fs.get(file_doc["content_file_id"]).read().decode('utf-8')
+            else:
+                yield file_doc["path"], file_doc["content"]
+                
     def get_all_files(self, repo_id: str) -> List[str]:
         """
         Get all file paths for a repository.
@@ -152,12 +701,100 @@ class MongoDBHandler:
             List[str]: List of file paths
         """
         try:
-            files = self.db.files.find({"repo_id": repo_id})
+            # Project only the path, file documents also carry the full content;
+            # the query is then covered by the (repo_id, path) index
+            files = self.db.files.find(
+                {"repo_id": repo_id}, {"path": 1, "_id": 0}, hint=_FILE_INDEX, batch_size=_SCAN_BATCH_SIZE
+            )
             return [file["path"] for file in files]
         except Exception as e:
             console.print(f"[red]Error getting all files: {e}")
             return []
             
+    def get_filtered_file_paths(self, repo_id: str, ignore_pattern: Optional[Pattern] = None) -> List[str]:
+        """
+        Get the sorted file paths of a repository, leaving out ignored paths on the server.
+        
+        Args:
+            repo_id: Repository ID
+            ignore_pattern: Regex matching the paths to leave out (all paths if None)
+            
+        Returns:
+            List[str]: Sorted list of file paths
+        """
+        query = {"repo_id": repo_id}
+        if ignore_pattern is not None:
+            query["path"] = {"$not": ignore_pattern}
+            
+        try:
+            # Covered by the (repo_id, path) index, which also yields the paths in order
+            files = self.db.files.find(
+                query, {"path": 1, "_id": 0}, hint=_FILE_INDEX, batch_size=_SCAN_BATCH_SIZE
+            ).sort("path", 1)
+            return [file["path"] for file in files]
+        except Exception as e:
+            console.print(f"[red]Error getting file paths: {e}")
+            return []
+            
+    def get_file_metadata(self, repo_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get metadata for all files of a repository, without their contents.
+        
+        Args:
+            repo_id: Repository ID
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Mapping of file path to metadata ("size", "signature")
+        """
+        try:
+            files = self.db.files.find(
+                {"repo_id": repo_id},
+                {"path": 1, "size": 1, "signature": 1, "_id": 0},
+                hint=_FILE_INDEX,
+                batch_size=_SCAN_BATCH_SIZE
+            )
+            return {file.pop("path"): file for file in files}
+        except Exception as e:
+            console.print(f"[red]Error getting file metadata: {e}")
+            return {}
+            
+    def get_file_shas(self, repo_id: str) -> Dict[str, Optional[str]]:
+        """
+        Get the Git blob SHA each stored file of a repository was fetched from.
+        
+        Args:
+            repo_id: Repository ID
+            
+        Returns:
+            Dict[str, Optional[str]]: Mapping of file path to blob SHA (None if unknown)
+        """
+        try:
+            files = self.db.files.find(
+                {"repo_id": repo_id}, {"path": 1, "sha": 1, "_id": 0}, hint=_FILE_INDEX, batch_size=_SCAN_BATCH_SIZE
+            )
+            return {file["path"]: file.get("sha") for file in files}
+        except Exception as e:
+            console.print(f"[red]Error getting file SHAs: {e}")
+            return {}
+            
+    def delete_files(self, repo_id: str, file_paths: List[str]) -> None:
+        """
+        Delete files of a repository from MongoDB.
+        
+        Args:
+            repo_id: Repository ID
+            file_paths: Paths of the files to delete
+        """
+        for file_path in file_paths:
+            self._content_cache.pop((repo_id, file_path))
+            
+        try:
+            self._delete_blobs(self._get_blob_ids(repo_id, file_paths).values())
+            self.db.files.delete_many({"repo_id": repo_id, "path": {"$in": file_paths}})
+            console.print(f"[green]Deleted {len(file_paths)} files no longer in the repository")
+        except Exception as e:
+            console.print(f"[red]Error deleting files: {e}")
+            
     def delete_repository(self, repo_id: str) -> bool:
         """
         Delete repository and its files from MongoDB.
@@ -168,12 +805,15 @@ class MongoDBHandler:
         Returns:
             bool: True if successful, False otherwise
         """
+        self._repo_cache.clear()
+        self._content_cache.clear()
+        
         try:
-            from bson.objectid import ObjectId
             # Delete repository document
-            self.db.repositories.delete_one({"_id": ObjectId(repo_id)})
+            self.db.repositories.delete_one({"_id": _oid(repo_id)})
             
             # Delete all files associated with the repository
+            self._delete_blobs(self._get_blob_ids(repo_id).values())
             self.db.files.delete_many({"repo_id": repo_id})
             
             console.print(f"[green]Repository {repo_id} and its files deleted from MongoDB")
@@ -181,3 +821,16 @@ class MongoDBHandler:
         except Exception as e:
             console.print(f"[red]Error deleting repository: {e}")
             return False
+
+@functools.lru_cache(maxsize=1)
+def get_mongodb_handler() -> MongoDBHandler:
+    """
+    Get the process-wide MongoDB handler, creating it on first use.
+    
+    MongoClient keeps its own connection pool, so one handler can serve the
+    whole process instead of each caller opening a new client.
+    
+    Returns:
+        MongoDBHandler: Shared handler using the default URI and database
+    """
+    return MongoDBHandler()
@@ -0,0 +1,109 @@
+"""
+Tests for the BM25 search index.
+"""
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.bm25_index import BM25Index, tokenize
+
+DOCUMENTS = [
+    ("src/parser.py", "def parse_config(path):\n    return load_yaml(path)"),
+    ("src/server.py", "class HttpServer:\n    def handle_request(self, request): pass"),
+    ("docs/config.md", "Configuration is parsed from config.yaml; see parse_config."),
+]
+
+class TestTokenize(unittest.TestCase):
+    """Test cases for tokenize."""
+    
+    def test_camel_case(self):
+        """Test that camelCase names are split and also kept whole."""
+        self.assertEqual(tokenize("parseHTTPResponse"), ["parsehttpresponse", "parse", "http", "response"])
+    
+    def test_snake_case(self):
+        """Test that snake_case names are split on underscores."""
+        self.assertEqual(tokenize("get_file_content"), ["get", "file", "content"])
+    
+    def test_dotted_and_path_names(self):
+        """Test that dotted names and paths are split on their separators."""
+        self.assertEqual(tokenize("os.path.join"), ["os", "path", "join"])
+        self.assertEqual(tokenize("src/git_handler.py"), ["src", "git", "handler", "py"])
+    
+    def test_single_character_parts_dropped(self):
+        """Test that single-character parts are dropped."""
+        self.assertEqual(tokenize("a x_y getX"), ["getx", "get"])
+
+class TestBM25Index(unittest.TestCase):
+    """Test cases for BM25Index."""
+    
+    def setUp(self):
+        """Build an index over the sample documents."""
+        self.index = BM25Index.build(DOCUMENTS)
+    
+    def test_search_ranking(self):
+        """Test that documents matching more query terms rank first."""
+        results = self.index.search("parse config")
+        paths = [path for path, _ in results]
+        self.assertEqual(set(paths), {"src/parser.py", "docs/config.md"})
+        scores = [score for _, score in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        
+        self.assertEqual(self.index.search("http server")[0][0], "src/server.py")
+    
+    def test_search_k_cutoff(self):
+        """Test that k limits the number of results to the best ones."""
+        results = self.index.search("parse config")
+        self.assertEqual(self.index.search("parse config", k=1), results[:1])
+        self.assertEqual(len(self.index.search("parse config", k=10)), len(results))
+    
+    def test_search_no_match(self):
+        """Test that a query without known terms returns nothing."""
+        self.assertEqual(self.index.search("kubernetes"), [])
+    
+    def test_empty_corpus(self):
+        """Test building and searching an index over no documents."""
+        index = BM25Index.build([])
+        self.assertEqual(index.doc_ids, [])
+        self.assertEqual(index.search("anything"), [])
+    
+    def test_corpus_without_tokens(self):
+        """Test building over documents without any tokens (average length 0)."""
+        index = BM25Index.build([("", ""), ("-", "  ")])
+        self.assertEqual(index.doc_ids, ["", "-"])
+        self.assertEqual(index.search("anything"), [])
+    
+    def test_save_load_round_trip(self):
+        """Test that a saved index loads with the same documents and results."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "repo" / "bm25.json.gz"
+            self.index.save(path)
+            loaded = BM25Index.load(path)
+        
+        self.assertIsNotNone(loaded)
+        self.assertEqual(loaded.doc_ids, self.index.doc_ids)
+        for query in ("parse config", "http server", "yaml"):
+            with self.subTest(query=query):
+                expected = [(path, round(score, 4)) for path, score in self.index.search(query)]
+                actual = [(path, round(score, 4)) for path, score in loaded.search(query)]
+                self.assertEqual(actual, expected)
+    
+    def test_load_missing_file(self):
+        """Test that loading a missing index returns None."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertIsNone(BM25Index.load(Path(tmp_dir) / "bm25.json.gz"))
+    
+    def test_load_corrupt_file(self):
+        """Test that loading a corrupt index returns None."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            not_gzip = Path(tmp_dir) / "not_gzip.json.gz"
+            not_gzip.write_bytes(b"not a gzip file")
+            self.assertIsNone(BM25Index.load(not_gzip))
+            
+            not_json = Path(tmp_dir) / "not_json.json.gz"
+            with gzip.open(str(not_json), "wt", encoding="utf-8") as f:
+                f.write("{not json")
+            self.assertIsNone(BM25Index.load(not_json))
+
+if __name__ == "__main__":
+    unittest.main()
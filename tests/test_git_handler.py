@@ -1,33 +1,66 @@
 """
 Tests for the GitHandler class.
 """
-import os
-import tempfile
 import unittest
-from pathlib import Path
+from unittest import mock
 
 from src.git_handler import GitHandler
 
+# Repository URLs and the (owner, repository name) parsed from them
+URL_CASES = [
+    ("https://github.com/example/repo", ("example", "repo")),
+    ("https://github.com/example/repo.git", ("example", "repo")),
+    ("https://github.com/example/repo/", ("example", "repo")),
+    ("https://github.com/example/repo/tree/main/src", ("example", "repo")),
+    ("git@github.com:example/repo.git", ("example", "repo")),
+    ("github.com/example/repo", ("example", "repo")),
+    ("https://github.com/example/repo.js", ("example", "repo.js")),
+]
+
 class TestGitHandler(unittest.TestCase):
     """Test cases for GitHandler."""
     
+    @classmethod
+    def setUpClass(cls):
+        """Replace the MongoDB handler and create one GitHandler for the URL cases."""
+        cls.mongodb_patcher = mock.patch("src.git_handler.get_mongodb_handler")
+        cls.get_mongodb_handler = cls.mongodb_patcher.start()
+        cls.handler = GitHandler(owner="example", repo="repo")
+        
+    @classmethod
+    def tearDownClass(cls):
+        """Restore the MongoDB handler."""
+        cls.mongodb_patcher.stop()
+    
     def test_init(self):
-        """Test initialization."""
+        """Test initialization with a repository URL."""
         handler = GitHandler(repo_url="https://github.com/example/repo.git")
         self.assertEqual(handler.repo_url, "https://github.com/example/repo.git")
-        self.assertIsNone(handler.local_path)
-        
-    def test_init_with_local_path(self):
-        """Test initialization with local path."""
-        handler = GitHandler(
-            repo_url="https://github.com/example/repo.git",
-            local_path="/tmp/repo"
-        )
-        self.assertEqual(handler.repo_url, "https://github.com/example/repo.git")
-        self.assertEqual(handler.local_path, "/tmp/repo")
-        
+        self.assertEqual((handler.owner, handler.repo_name), ("example", "repo"))
+    
+    def test_init_with_owner_and_repo(self):
+        """Test initialization with owner and repository name."""
+        handler = GitHandler(owner="example", repo="repo")
+        self.assertIsNone(handler.repo_url)
+        self.assertEqual((handler.owner, handler.repo_name), ("example", "repo"))
+        self.assertIs(handler.mongodb, self.get_mongodb_handler.return_value)
+    
+    def test_parse_repo_url(self):
+        """Test parsing the supported URL forms."""
+        for repo_url, expected in URL_CASES:
+            with self.subTest(repo_url=repo_url):
+                self.handler.repo_url = repo_url
+                self.handler._parse_repo_url()
+                self.assertEqual((self.handler.owner, self.handler.repo_name), expected)
+    
+    def test_parse_invalid_repo_url(self):
+        """Test that a URL without an owner and repository is rejected."""
+        self.handler.repo_url = "https://gitlab.com/example/repo"
+        with self.assertRaises(ValueError):
+            self.handler._parse_repo_url()
+    
     # Note: The following tests would require mocking git operations
     # or using a real repository, which is beyond the scope of this example
-    
+
 if __name__ == "__main__":
     unittest.main()